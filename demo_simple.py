@@ -1,91 +1,242 @@
 #!/usr/bin/env python3
 """
 简化的腐蚀检测Agent演示
-不依赖复杂的外部库，展示系统的核心工作流程
+不依赖LangGraph、OpenCV等复杂外部库，展示系统的核心工作流程
+
+依赖：numpy（必需）；numba、orjson（可选，安装后分别用于JIT加速与快速JSON序列化）
 """
 
 import json
+import sys
 import uuid
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from random import uniform, randint
 from datetime import datetime
+from enum import IntEnum
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from types import GeneratorType
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """numba未安装时的空装饰器，退化为普通Python函数"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _dumps_fragment(obj: Any) -> bytes:
+    """将单个JSON片段序列化为UTF-8编码的紧凑字节串（优先使用orjson）"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(
+        obj, ensure_ascii=False, separators=(",", ":"),
+        default=lambda o: o.isoformat() if isinstance(o, datetime) else o.tolist()
+    ).encode("utf-8")
+
+
+def _iter_report_json(fields: Dict[str, Any]) -> Iterator[bytes]:
+    """逐段生成报告JSON字节流
+    
+    值为生成器的字段按列表逐项序列化、每项一行输出，
+    整份报告不会在内存中物化为完整的字典树。
+    """
+    yield b"{"
+    for n, (key, value) in enumerate(fields.items()):
+        yield b"\n  " if n == 0 else b",\n  "
+        yield _dumps_fragment(key) + b": "
+        if isinstance(value, GeneratorType):
+            empty = True
+            for item in value:
+                yield b"[\n    " if empty else b",\n    "
+                yield _dumps_fragment(item)
+                empty = False
+            yield b"[]" if empty else b"\n  ]"
+        else:
+            yield _dumps_fragment(value)
+    yield b"\n}\n"
 
 # 简化的数据模型
-class SensorType:
-    THICKNESS = "thickness"
-    TEMPERATURE = "temperature"
-    HUMIDITY = "humidity"
-    PH = "ph"
+class SensorType(IntEnum):
+    THICKNESS = 0
+    TEMPERATURE = 1
+    HUMIDITY = 2
+    PH = 3
+    
+    @property
+    def label(self) -> str:
+        """报告和传感器ID中使用的小写名称，如 thickness"""
+        return self.name.lower()
 
-class CorrosionLevel:
-    LOW = "LOW"
-    MEDIUM = "MEDIUM"
-    HIGH = "HIGH"
-    CRITICAL = "CRITICAL"
+class CorrosionLevel(IntEnum):
+    LOW = 0
+    MEDIUM = 1
+    HIGH = 2
+    CRITICAL = 3
 
+# 按枚举值索引的传感器类型名称，用于批量序列化
+_SENSOR_TYPE_LABELS = tuple(t.label for t in SensorType)
+
+@dataclass
 class SensorData:
-    def __init__(self, sensor_id: str, sensor_type: str, value: float, unit: str, 
-                 timestamp: datetime, location: Dict[str, float], quality: float):
-        self.sensor_id = sensor_id
-        self.sensor_type = sensor_type
-        self.value = value
-        self.unit = unit
-        self.timestamp = timestamp
-        self.location = location
-        self.quality = quality
+    __slots__ = ("sensor_id", "sensor_type", "value", "unit", "timestamp", "location", "quality")
+    
+    sensor_id: str
+    sensor_type: SensorType
+    value: float
+    unit: str
+    timestamp: datetime
+    location: Dict[str, float]
+    quality: float
 
+@dataclass
 class CorrosionDetection:
-    def __init__(self, detection_id: str, corrosion_area: float, corrosion_depth: float,
-                 corrosion_type: str, confidence: float, timestamp: datetime):
-        self.detection_id = detection_id
-        self.corrosion_area = corrosion_area
-        self.corrosion_depth = corrosion_depth
-        self.corrosion_type = corrosion_type
-        self.confidence = confidence
-        self.timestamp = timestamp
+    __slots__ = ("detection_id", "corrosion_area", "corrosion_depth", "corrosion_type", "confidence", "timestamp")
+    
+    detection_id: str
+    corrosion_area: float
+    corrosion_depth: float
+    corrosion_type: str
+    confidence: float
+    timestamp: datetime
 
+@dataclass
 class RiskAssessment:
-    def __init__(self, assessment_id: str, corrosion_level: str, risk_score: float,
-                 recommendations: List[str], urgency: str, timestamp: datetime):
-        self.assessment_id = assessment_id
-        self.corrosion_level = corrosion_level
-        self.risk_score = risk_score
-        self.recommendations = recommendations
-        self.urgency = urgency
-        self.timestamp = timestamp
+    __slots__ = ("assessment_id", "corrosion_level", "risk_score", "recommendations", "urgency", "timestamp")
+    
+    assessment_id: str
+    corrosion_level: CorrosionLevel
+    risk_score: float
+    recommendations: Tuple[str, ...]
+    urgency: str
+    timestamp: datetime
 
+@dataclass
 class InspectionReport:
-    def __init__(self, report_id: str, platform_id: str, area_inspected: str,
-                 sensor_data: List[SensorData], corrosion_detections: List[CorrosionDetection],
-                 risk_assessment: Optional[RiskAssessment], summary: str, timestamp: datetime):
-        self.report_id = report_id
-        self.platform_id = platform_id
-        self.area_inspected = area_inspected
-        self.sensor_data = sensor_data
-        self.corrosion_detections = corrosion_detections
-        self.risk_assessment = risk_assessment
-        self.summary = summary
-        self.timestamp = timestamp
+    __slots__ = ("report_id", "platform_id", "area_inspected", "sensor_data", "corrosion_detections",
+                 "risk_assessment", "summary", "timestamp")
+    
+    report_id: str
+    platform_id: str
+    area_inspected: str
+    sensor_data: List[SensorData]
+    corrosion_detections: List[CorrosionDetection]
+    risk_assessment: Optional[RiskAssessment]
+    summary: str
+    timestamp: datetime
 
 class AgentState:
+    __slots__ = ("session_id", "platform_id", "inspection_area", "current_step", "start_time",
+                 "sensor_readings", "corrosion_detections",
+                 "sensor_ids", "sensor_types", "sensor_indices_by_type", "sensor_units", "sensor_locations",
+                 "sensor_values", "sensor_qualities",
+                 "detection_ids", "corrosion_types",
+                 "corrosion_areas", "corrosion_depths", "corrosion_confidences",
+                 "total_area", "max_depth",
+                 "risk_assessment", "final_report", "errors", "warnings")
+    
     def __init__(self, session_id: str, platform_id: str, inspection_area: str):
         self.session_id = session_id
-        self.platform_id = platform_id
-        self.inspection_area = inspection_area
+        # 平台和区域标识在整个流程中反复比较和拼接，驻留后相等比较退化为指针比较
+        self.platform_id = sys.intern(platform_id)
+        self.inspection_area = sys.intern(inspection_area)
         self.current_step = "init"
         self.start_time = datetime.now()
         self.sensor_readings = []
         self.corrosion_detections = []
+        # 数值列（SoA布局），与上面的对象列表一一对应，用于向量化聚合和报告序列化
+        self.sensor_ids: List[str] = []
+        self.sensor_types = np.empty(0, dtype=np.int8)
+        # 按传感器类型分组的列下标，采集时构建一次，分析阶段直接查表
+        self.sensor_indices_by_type: Dict[SensorType, np.ndarray] = {}
+        self.sensor_units: List[str] = []
+        self.sensor_locations: List[Dict[str, float]] = []
+        self.sensor_values = np.empty(0)
+        self.sensor_qualities = np.empty(0)
+        self.detection_ids: List[str] = []
+        self.corrosion_types: List[str] = []
+        self.corrosion_areas = np.empty(0)
+        self.corrosion_depths = np.empty(0)
+        self.corrosion_confidences = np.empty(0)
+        # 风险评估阶段汇总的腐蚀总面积与最大深度
+        self.total_area = 0.0
+        self.max_depth = 0.0
         self.risk_assessment = None
         self.final_report = None
         self.errors = []
         self.warnings = []
 
+# 风险等级划分：阈值升序排列，区间索引依次对应 LOW/MEDIUM/HIGH/CRITICAL
+_RISK_THRESHOLDS = np.array([0.3, 0.6, 0.8])
+_RISK_LEVELS = (CorrosionLevel.LOW, CorrosionLevel.MEDIUM, CorrosionLevel.HIGH, CorrosionLevel.CRITICAL)
+_RISK_URGENCIES = ("低", "中等", "高", "紧急")
+# 建议列表为常量元组，由各 RiskAssessment 实例共享引用
+_NO_CORROSION_RECOMMENDATIONS = ("继续定期监测", "保持当前维护计划")
+_RISK_RECOMMENDATIONS = (
+    (
+        "继续按现有计划进行定期检测",
+        "保持良好的防腐涂层维护"
+    ),
+    (
+        "增加检测频率至每3个月一次",
+        "对检测到的腐蚀区域进行局部处理",
+        "检查并更新防腐措施"
+    ),
+    (
+        "立即对严重腐蚀区域进行维修",
+        "每月进行详细检测",
+        "更换或加强防腐涂层",
+        "考虑增加阴极保护措施"
+    ),
+    (
+        "紧急停止相关设备运行",
+        "立即安排专业维修团队",
+        "每周进行安全检测",
+        "重新评估整体结构安全性"
+    )
+)
+
+@njit(cache=True)
+def _risk_score(areas, depths):
+    """单次遍历腐蚀面积和深度数组，返回 (综合风险评分, 总面积, 最大深度)"""
+    total = 0.0
+    mx = 0.0
+    for i in range(areas.size):
+        total += areas[i]
+        if depths[i] > mx:
+            mx = depths[i]
+    
+    area_factor = min(1.0, total / 1000.0)
+    depth_factor = min(1.0, mx / 3.0)
+    count_factor = min(1.0, areas.size / 5.0)
+    
+    return area_factor * 0.4 + depth_factor * 0.5 + count_factor * 0.1, total, mx
+
 class SimpleCorrosionAgent:
     """简化的腐蚀检测Agent"""
     
     def __init__(self):
         print("🔧 初始化腐蚀检测Agent...")
+        self.rng = np.random.default_rng()
+        # 输出目录只需创建一次
+        self._output_dir = Path("outputs/reports")
+        self._output_dir.mkdir(parents=True, exist_ok=True)
+        # 预热JIT编译，避免首次检测时的编译延迟
+        _risk_score(np.zeros(1), np.zeros(1))
     
     def run_inspection(self, platform_id: str, inspection_area: str) -> AgentState:
         """运行完整的检测流程"""
@@ -93,7 +244,7 @@ class SimpleCorrosionAgent:
         
         # 初始化状态
         state = AgentState(
-            session_id=str(uuid.uuid4()),
+            session_id=uuid.uuid4().hex,
             platform_id=platform_id,
             inspection_area=inspection_area
         )
@@ -124,41 +275,60 @@ class SimpleCorrosionAgent:
         print("📊 开始数据收集...")
         state.current_step = "data_collection"
         
-        # 模拟传感器数据收集
-        import random
+        # 模拟传感器数据收集（一次性批量生成随机数）
+        rng = self.rng
+        now = datetime.now()
         
         # 厚度传感器数据
-        for i in range(3):
-            thickness_loss = random.uniform(0, 2.5)  # 0-2.5mm的厚度损失
-            reading = SensorData(
+        thickness_losses = rng.uniform(0, 2.5, 3)  # 0-2.5mm的厚度损失
+        thickness_qualities = rng.uniform(0.85, 0.98, 3)
+        
+        # 环境传感器数据（按列给定上下限，一次抽样）
+        env_sensors = [
+            (SensorType.TEMPERATURE, "°C"),
+            (SensorType.HUMIDITY, "%RH"),
+            (SensorType.PH, "pH")
+        ]
+        env_values = rng.uniform([15, 60, 7.5], [35, 90, 8.5])
+        env_qualities = rng.uniform(0.88, 0.96, len(env_sensors))
+        
+        # 随机数已全部生成，读数列表一次构建完成
+        state.sensor_readings = [
+            SensorData(
                 sensor_id=f"thickness_{state.inspection_area}_{i+1}",
                 sensor_type=SensorType.THICKNESS,
                 value=12.0 - thickness_loss,  # 基础厚度12mm
                 unit="mm",
-                timestamp=datetime.now(),
+                timestamp=now,
                 location={"x": i * 10, "y": 0, "z": 0},
-                quality=random.uniform(0.85, 0.98)
+                quality=quality
             )
-            state.sensor_readings.append(reading)
-        
-        # 环境传感器数据
-        env_sensors = [
-            (SensorType.TEMPERATURE, random.uniform(15, 35), "°C"),
-            (SensorType.HUMIDITY, random.uniform(60, 90), "%RH"),
-            (SensorType.PH, random.uniform(7.5, 8.5), "pH")
-        ]
-        
-        for sensor_type, value, unit in env_sensors:
-            reading = SensorData(
-                sensor_id=f"{sensor_type}_{state.inspection_area}",
+            for i, (thickness_loss, quality) in enumerate(zip(thickness_losses, thickness_qualities))
+        ] + [
+            SensorData(
+                sensor_id=f"{sensor_type.label}_{state.inspection_area}",
                 sensor_type=sensor_type,
                 value=value,
                 unit=unit,
-                timestamp=datetime.now(),
+                timestamp=now,
                 location={"x": 0, "y": 0, "z": 0},
-                quality=random.uniform(0.88, 0.96)
+                quality=quality
             )
-            state.sensor_readings.append(reading)
+            for (sensor_type, unit), value, quality in zip(env_sensors, env_values, env_qualities)
+        ]
+        
+        # 同步写入列数据
+        readings = state.sensor_readings
+        state.sensor_ids = [r.sensor_id for r in readings]
+        state.sensor_types = np.array([r.sensor_type for r in readings], dtype=np.int8)
+        state.sensor_indices_by_type = {
+            SensorType(t): np.flatnonzero(state.sensor_types == t)
+            for t in np.unique(state.sensor_types).tolist()
+        }
+        state.sensor_units = [r.unit for r in readings]
+        state.sensor_locations = [r.location for r in readings]
+        state.sensor_values = np.concatenate((12.0 - thickness_losses, env_values))
+        state.sensor_qualities = np.concatenate((thickness_qualities, env_qualities))
         
         print(f"   ✓ 收集了 {len(state.sensor_readings)} 个传感器读数")
         return state
@@ -167,20 +337,23 @@ class SimpleCorrosionAgent:
         """腐蚀分析节点"""
         print("🔍 开始腐蚀分析...")
         state.current_step = "corrosion_analysis"
+        now = datetime.now()
         
         # 基于传感器数据进行腐蚀分析
-        thickness_readings = [r for r in state.sensor_readings if r.sensor_type == SensorType.THICKNESS]
-        
-        import random
+        thickness_idx = state.sensor_indices_by_type[SensorType.THICKNESS]
+        thickness_loss = 12.0 - state.sensor_values[thickness_idx].min()
         
         # 模拟发现腐蚀点
-        num_corrosions = random.randint(0, 3)
+        num_corrosions = randint(0, 3)
+        
+        areas = np.empty(num_corrosions)
+        depths = np.empty(num_corrosions)
+        confidences = np.empty(num_corrosions)
         
         for i in range(num_corrosions):
             # 计算腐蚀参数
-            thickness_loss = 12.0 - min(r.value for r in thickness_readings)
-            corrosion_area = random.uniform(50, 500)  # 平方毫米
-            corrosion_depth = max(0.1, thickness_loss + random.uniform(-0.3, 0.5))
+            corrosion_area = uniform(50, 500)  # 平方毫米
+            corrosion_depth = max(0.1, thickness_loss + uniform(-0.3, 0.5))
             
             # 确定腐蚀类型
             if corrosion_area < 100:
@@ -195,10 +368,20 @@ class SimpleCorrosionAgent:
                 corrosion_area=corrosion_area,
                 corrosion_depth=corrosion_depth,
                 corrosion_type=corrosion_type,
-                confidence=random.uniform(0.7, 0.95),
-                timestamp=datetime.now()
+                confidence=uniform(0.7, 0.95),
+                timestamp=now
             )
             state.corrosion_detections.append(detection)
+            
+            state.detection_ids.append(detection.detection_id)
+            state.corrosion_types.append(corrosion_type)
+            areas[i] = corrosion_area
+            depths[i] = corrosion_depth
+            confidences[i] = detection.confidence
+        
+        state.corrosion_areas = areas
+        state.corrosion_depths = depths
+        state.corrosion_confidences = confidences
         
         print(f"   ✓ 检测到 {len(state.corrosion_detections)} 个腐蚀点")
         return state
@@ -207,6 +390,7 @@ class SimpleCorrosionAgent:
         """风险评估节点"""
         print("⚠️  开始风险评估...")
         state.current_step = "risk_assessment"
+        now = datetime.now()
         
         if not state.corrosion_detections:
             # 没有检测到腐蚀
@@ -214,67 +398,35 @@ class SimpleCorrosionAgent:
                 assessment_id=f"risk_{state.session_id}",
                 corrosion_level=CorrosionLevel.LOW,
                 risk_score=0.1,
-                recommendations=["继续定期监测", "保持当前维护计划"],
+                recommendations=_NO_CORROSION_RECOMMENDATIONS,
                 urgency="低",
-                timestamp=datetime.now()
+                timestamp=now
             )
         else:
             # 计算风险评分
-            total_area = sum(d.corrosion_area for d in state.corrosion_detections)
-            max_depth = max(d.corrosion_depth for d in state.corrosion_detections)
-            
-            # 风险因子计算
-            area_factor = min(1.0, total_area / 1000.0)
-            depth_factor = min(1.0, max_depth / 3.0)
-            count_factor = min(1.0, len(state.corrosion_detections) / 5.0)
+            risk_score, total_area, max_depth = _risk_score(state.corrosion_areas, state.corrosion_depths)
+            risk_score = float(risk_score)
             
-            risk_score = (area_factor * 0.4 + depth_factor * 0.5 + count_factor * 0.1)
+            # 缓存汇总值，供报告生成直接使用
+            state.total_area = float(total_area)
+            state.max_depth = float(max_depth)
             
-            # 确定风险等级
-            if risk_score < 0.3:
-                level = CorrosionLevel.LOW
-                urgency = "低"
-                recommendations = [
-                    "继续按现有计划进行定期检测",
-                    "保持良好的防腐涂层维护"
-                ]
-            elif risk_score < 0.6:
-                level = CorrosionLevel.MEDIUM
-                urgency = "中等"
-                recommendations = [
-                    "增加检测频率至每3个月一次",
-                    "对检测到的腐蚀区域进行局部处理",
-                    "检查并更新防腐措施"
-                ]
-            elif risk_score < 0.8:
-                level = CorrosionLevel.HIGH
-                urgency = "高"
-                recommendations = [
-                    "立即对严重腐蚀区域进行维修",
-                    "每月进行详细检测",
-                    "更换或加强防腐涂层",
-                    "考虑增加阴极保护措施"
-                ]
-            else:
-                level = CorrosionLevel.CRITICAL
-                urgency = "紧急"
-                recommendations = [
-                    "紧急停止相关设备运行",
-                    "立即安排专业维修团队",
-                    "每周进行安全检测",
-                    "重新评估整体结构安全性"
-                ]
+            # 确定风险等级（按阈值有序数组定位区间）
+            idx = int(np.searchsorted(_RISK_THRESHOLDS, risk_score, side="right"))
+            level = _RISK_LEVELS[idx]
+            urgency = _RISK_URGENCIES[idx]
+            recommendations = _RISK_RECOMMENDATIONS[idx]
             
             state.risk_assessment = RiskAssessment(
-                assessment_id=f"risk_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+                assessment_id=f"risk_{now.strftime('%Y%m%d_%H%M%S')}",
                 corrosion_level=level,
                 risk_score=risk_score,
                 recommendations=recommendations,
                 urgency=urgency,
-                timestamp=datetime.now()
+                timestamp=now
             )
         
-        print(f"   ✓ 风险等级: {state.risk_assessment.corrosion_level}")
+        print(f"   ✓ 风险等级: {state.risk_assessment.corrosion_level.name}")
         print(f"   ✓ 风险评分: {state.risk_assessment.risk_score:.2f}")
         return state
     
@@ -282,31 +434,31 @@ class SimpleCorrosionAgent:
         """生成报告节点"""
         print("📄 开始生成报告...")
         state.current_step = "report_generation"
+        now = datetime.now()
         
-        # 生成摘要
-        summary_parts = [
-            f"检测区域: {state.inspection_area}",
-            f"检测时间: {state.start_time.strftime('%Y-%m-%d %H:%M:%S')}",
-            f"传感器数据: 收集了 {len(state.sensor_readings)} 个传感器读数",
-            f"腐蚀检测: {'发现 ' + str(len(state.corrosion_detections)) + ' 个腐蚀点' if state.corrosion_detections else '未发现明显腐蚀'}"
-        ]
-        
+        # 生成摘要：条件片段先单独求值，再由一个f-string拼接
         if state.corrosion_detections:
-            total_area = sum(d.corrosion_area for d in state.corrosion_detections)
-            max_depth = max(d.corrosion_depth for d in state.corrosion_detections)
-            summary_parts.extend([
-                f"总腐蚀面积: {total_area:.2f} 平方毫米",
-                f"最大腐蚀深度: {max_depth:.2f} 毫米"
-            ])
+            detection_part = (
+                f"腐蚀检测: 发现 {len(state.corrosion_detections)} 个腐蚀点\\n"
+                f"总腐蚀面积: {state.total_area:.2f} 平方毫米\\n"
+                f"最大腐蚀深度: {state.max_depth:.2f} 毫米"
+            )
+        else:
+            detection_part = "腐蚀检测: 未发现明显腐蚀"
         
-        if state.risk_assessment:
-            summary_parts.extend([
-                f"风险等级: {state.risk_assessment.corrosion_level}",
-                f"风险评分: {state.risk_assessment.risk_score:.2f}",
-                f"紧急程度: {state.risk_assessment.urgency}"
-            ])
+        risk = state.risk_assessment
+        risk_part = (
+            f"\\n风险等级: {risk.corrosion_level.name}"
+            f"\\n风险评分: {risk.risk_score:.2f}"
+            f"\\n紧急程度: {risk.urgency}"
+        ) if risk else ""
         
-        summary = "\\n".join(summary_parts)
+        summary = (
+            f"检测区域: {state.inspection_area}\\n"
+            f"检测时间: {state.start_time:%Y-%m-%d %H:%M:%S}\\n"
+            f"传感器数据: 收集了 {len(state.sensor_readings)} 个传感器读数\\n"
+            f"{detection_part}{risk_part}"
+        )
         
         # 创建报告
         state.final_report = InspectionReport(
@@ -317,50 +469,53 @@ class SimpleCorrosionAgent:
             corrosion_detections=state.corrosion_detections,
             risk_assessment=state.risk_assessment,
             summary=summary,
-            timestamp=datetime.now()
+            timestamp=now
         )
         
         # 保存报告
-        self._save_report(state.final_report)
+        self._save_report(state)
         
         print(f"   ✓ 报告ID: {state.final_report.report_id}")
         return state
     
-    def _save_report(self, report: InspectionReport):
+    def _save_report(self, state: AgentState):
         """保存报告到文件"""
+        report = state.final_report
         try:
-            # 创建输出目录
-            output_dir = Path("outputs/reports")
-            output_dir.mkdir(parents=True, exist_ok=True)
-            
-            # 转换为字典格式
-            report_dict = {
+            # 报告字段；列表字段以生成器给出，写入时逐项序列化
+            report_fields = {
                 "report_id": report.report_id,
-                "timestamp": report.timestamp.isoformat(),
+                "timestamp": report.timestamp,
                 "platform_id": report.platform_id,
                 "area_inspected": report.area_inspected,
-                "sensor_data": [
+                "sensor_data": (
                     {
-                        "sensor_id": s.sensor_id,
-                        "sensor_type": s.sensor_type,
-                        "value": s.value,
-                        "unit": s.unit,
-                        "location": s.location,
-                        "quality": s.quality
-                    } for s in report.sensor_data
-                ],
-                "corrosion_detections": [
+                        "sensor_id": sensor_id,
+                        "sensor_type": _SENSOR_TYPE_LABELS[sensor_type],
+                        "value": value,
+                        "unit": unit,
+                        "location": location,
+                        "quality": quality
+                    } for sensor_id, sensor_type, value, unit, location, quality in zip(
+                        state.sensor_ids, state.sensor_types.tolist(), state.sensor_values.tolist(),
+                        state.sensor_units, state.sensor_locations, state.sensor_qualities.tolist()
+                    )
+                ),
+                "corrosion_detections": (
                     {
-                        "detection_id": d.detection_id,
-                        "corrosion_area": d.corrosion_area,
-                        "corrosion_depth": d.corrosion_depth,
-                        "corrosion_type": d.corrosion_type,
-                        "confidence": d.confidence
-                    } for d in report.corrosion_detections
-                ],
+                        "detection_id": detection_id,
+                        "corrosion_area": area,
+                        "corrosion_depth": depth,
+                        "corrosion_type": corrosion_type,
+                        "confidence": confidence
+                    } for detection_id, area, depth, corrosion_type, confidence in zip(
+                        state.detection_ids, state.corrosion_areas.tolist(), state.corrosion_depths.tolist(),
+                        state.corrosion_types, state.corrosion_confidences.tolist()
+                    )
+                ),
                 "risk_assessment": {
                     "assessment_id": report.risk_assessment.assessment_id,
-                    "corrosion_level": report.risk_assessment.corrosion_level,
+                    "corrosion_level": report.risk_assessment.corrosion_level.name,
                     "risk_score": report.risk_assessment.risk_score,
                     "recommendations": report.risk_assessment.recommendations,
                     "urgency": report.risk_assessment.urgency
@@ -369,23 +524,25 @@ class SimpleCorrosionAgent:
             }
             
             # 保存JSON文件
-            json_file = output_dir / f"{report.report_id}.json"
-            with open(json_file, 'w', encoding='utf-8') as f:
-                json.dump(report_dict, f, ensure_ascii=False, indent=2)
+            json_file = self._output_dir / f"{report.report_id}.json"
+            with open(json_file, "wb", buffering=65536) as f:
+                f.writelines(_iter_report_json(report_fields))
             
             print(f"   ✓ 报告已保存到: {json_file}")
             
         except Exception as e:
             print(f"   ❌ 保存报告失败: {e}")
 
+def _run_example(example: Tuple[str, str]) -> AgentState:
+    """在工作进程中运行单个示例检测（各进程独立创建Agent实例）"""
+    platform_id, area = example
+    return SimpleCorrosionAgent().run_inspection(platform_id, area)
+
 def main():
     """主函数"""
     print("🌊 海上石油平台腐蚀检测Agent - 演示模式")
     print("=" * 60)
     
-    # 创建Agent实例
-    agent = SimpleCorrosionAgent()
-    
     # 运行示例检测
     examples = [
         ("PLATFORM_001", "甲板区域A"),
@@ -393,12 +550,12 @@ def main():
         ("PLATFORM_003", "储罐区域C")
     ]
     
-    results = []
+    # 各平台检测相互独立，分发到多个进程并行执行
+    with ProcessPoolExecutor(max_workers=len(examples)) as executor:
+        results = list(executor.map(_run_example, examples))
     
-    for platform_id, area in examples:
+    for result in results:
         print(f"\\n{'='*60}")
-        result = agent.run_inspection(platform_id, area)
-        results.append(result)
         
         # 显示结果摘要
         if result.final_report:
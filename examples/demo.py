@@ -107,10 +107,10 @@ def example_sync_inspection():
     agent = CorrosionDetectionAgent()
     
     # 运行同步检测
-    result = agent.run_inspection_sync(
+    result = asyncio.run(agent.run_inspection(
         platform_id="PLATFORM_003",
         inspection_area="储罐区域C"
-    )
+    ))
     
     print(f"同步检测完成: {result.session_id}")
     
@@ -136,8 +136,8 @@ async def run_all_examples():
         result2 = await example_with_sample_data()
         print("\\n" + "="*50 + "\\n")
         
-        # 示例3: 同步模式
-        result3 = example_sync_inspection()
+        # 示例3: 同步模式（asyncio.run 不能在运行中的事件循环内调用，放到工作线程执行）
+        result3 = await asyncio.get_running_loop().run_in_executor(None, example_sync_inspection)
         
         print("\\n🎉 所有示例运行完成!")
         print(f"生成的报告:")
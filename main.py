@@ -6,17 +6,28 @@
 
 import asyncio
 import argparse
+import os
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Set
 
-from src.agents.corrosion_agent import CorrosionDetectionAgent
-from src.config import config
+# Agent、配置和日志库在真正运行检测时才导入，--help 和参数校验不必等待
+# OpenCV/NumPy 等重量级依赖加载
+
+# 日志处理器只需注册一次，重复调用setup_logging直接复用
+_logger_initialized = False
 
 
 def setup_logging():
-    """设置日志"""
+    """设置日志（幂等）"""
+    global _logger_initialized
     from loguru import logger
+    
+    if _logger_initialized:
+        return logger
+    _logger_initialized = True
+    
     import sys
+    from src.config import config
     
     # 移除默认处理器
     logger.remove()
@@ -40,47 +51,77 @@ def setup_logging():
     return logger
 
 
+async def _run_structured(coro):
+    """在结构化任务作用域中运行协程
+    
+    出错或被取消（如 Ctrl-C）时，保证任务被取消并等待其退出后再返回。
+    Python 3.11+ 使用 asyncio.TaskGroup，旧版本用 try/finally 模拟。
+    """
+    if hasattr(asyncio, "TaskGroup"):
+        try:
+            async with asyncio.TaskGroup() as tg:
+                task = tg.create_task(coro)
+        except BaseExceptionGroup as group:
+            # 只有一个子任务，直接抛出原始异常，保持调用方的错误处理不变
+            raise group.exceptions[0]
+        return task.result()
+    
+    task = asyncio.ensure_future(coro)
+    try:
+        return await task
+    finally:
+        if not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+
+def _log_result_summary(result, logger):
+    """输出检测结果摘要"""
+    from src.agents.corrosion_agent import CorrosionDetectionAgent
+    
+    logger.info("检测完成!")
+    
+    if result.final_report:
+        logger.info(f"报告ID: {result.final_report.report_id}")
+        logger.info(f"风险等级: {result.risk_assessment.corrosion_level.value if result.risk_assessment else 'N/A'}")
+        logger.info(f"检测的腐蚀点数量: {len(result.corrosion_detections)}")
+        
+        if result.corrosion_detections:
+            stats = CorrosionDetectionAgent.summarize_detections(result.corrosion_detections)
+            logger.info(f"总腐蚀面积: {stats['total_area']:.2f} 平方毫米")
+            logger.info(f"最大腐蚀深度: {stats['max_depth']:.2f} 毫米")
+    
+    if result.errors:
+        logger.error(f"检测过程中发现错误: {result.errors}")
+    
+    if result.warnings:
+        logger.warning(f"检测过程中的警告: {result.warnings}")
+
+
 async def run_inspection_async(platform_id: str, 
                              area: str, 
                              image_files: Optional[List[str]] = None,
                              sensor_files: Optional[List[str]] = None):
     """异步运行检测流程"""
+    from src.agents.corrosion_agent import get_agent
+    
     logger = setup_logging()
     
     logger.info(f"开始腐蚀检测: 平台={platform_id}, 区域={area}")
     
-    # 创建Agent实例
-    agent = CorrosionDetectionAgent()
+    # 复用进程内共享的Agent实例
+    agent = get_agent()
     
     try:
         # 运行检测流程
-        result = await agent.run_inspection(
+        result = await _run_structured(agent.run_inspection(
             platform_id=platform_id,
             inspection_area=area,
             image_files=image_files or [],
             sensor_files=sensor_files or []
-        )
-        
-        # 输出结果摘要
-        logger.info("检测完成!")
-        
-        if result.final_report:
-            logger.info(f"报告ID: {result.final_report.report_id}")
-            logger.info(f"风险等级: {result.risk_assessment.corrosion_level.value if result.risk_assessment else 'N/A'}")
-            logger.info(f"检测的腐蚀点数量: {len(result.corrosion_detections)}")
-            
-            if result.corrosion_detections:
-                total_area = sum(d.corrosion_area for d in result.corrosion_detections)
-                max_depth = max(d.corrosion_depth for d in result.corrosion_detections)
-                logger.info(f"总腐蚀面积: {total_area:.2f} 平方毫米")
-                logger.info(f"最大腐蚀深度: {max_depth:.2f} 毫米")
-        
-        if result.errors:
-            logger.error(f"检测过程中发现错误: {result.errors}")
-        
-        if result.warnings:
-            logger.warning(f"检测过程中的警告: {result.warnings}")
+        ))
         
+        _log_result_summary(result, logger)
         return result
         
     except Exception as e:
@@ -92,48 +133,35 @@ def run_inspection_sync(platform_id: str,
                        area: str, 
                        image_files: Optional[List[str]] = None,
                        sensor_files: Optional[List[str]] = None):
-    """同步运行检测流程"""
-    logger = setup_logging()
-    
-    logger.info(f"开始腐蚀检测: 平台={platform_id}, 区域={area}")
-    
-    # 创建Agent实例
-    agent = CorrosionDetectionAgent()
-    
-    try:
-        # 运行检测流程
-        result = agent.run_inspection_sync(
-            platform_id=platform_id,
-            inspection_area=area,
-            image_files=image_files or [],
-            sensor_files=sensor_files or []
-        )
-        
-        # 输出结果摘要
-        logger.info("检测完成!")
-        
-        if result.final_report:
-            logger.info(f"报告ID: {result.final_report.report_id}")
-            logger.info(f"风险等级: {result.risk_assessment.corrosion_level.value if result.risk_assessment else 'N/A'}")
-            logger.info(f"检测的腐蚀点数量: {len(result.corrosion_detections)}")
-            
-            if result.corrosion_detections:
-                total_area = sum(d.corrosion_area for d in result.corrosion_detections)
-                max_depth = max(d.corrosion_depth for d in result.corrosion_detections)
-                logger.info(f"总腐蚀面积: {total_area:.2f} 平方毫米")
-                logger.info(f"最大腐蚀深度: {max_depth:.2f} 毫米")
-        
-        if result.errors:
-            logger.error(f"检测过程中发现错误: {result.errors}")
-        
-        if result.warnings:
-            logger.warning(f"检测过程中的警告: {result.warnings}")
-        
-        return result
-        
-    except Exception as e:
-        logger.error(f"检测流程失败: {e}")
-        raise
+    """同步运行检测流程（在新事件循环中执行异步实现）"""
+    return asyncio.run(run_inspection_async(
+        platform_id=platform_id,
+        area=area,
+        image_files=image_files,
+        sensor_files=sensor_files
+    ))
+
+
+def _existing_paths(paths: List[str], kind: str, listings: Dict[Path, Set[str]]) -> List[str]:
+    """去重并筛选出存在的文件
+    
+    按所在目录分组，每个目录只调用一次 os.listdir，
+    用集合成员判断代替逐个文件的 stat 调用。
+    """
+    existing = []
+    for file_path in dict.fromkeys(paths):
+        path = Path(file_path)
+        parent = path.parent
+        if parent not in listings:
+            try:
+                listings[parent] = set(os.listdir(parent))
+            except OSError:
+                listings[parent] = set()
+        if path.name in listings[parent]:
+            existing.append(file_path)
+        else:
+            print(f"警告: {kind}文件不存在: {file_path}")
+    return existing
 
 
 def main():
@@ -148,22 +176,10 @@ def main():
     
     args = parser.parse_args()
     
-    # 验证文件路径
-    image_files = []
-    if args.images:
-        for img_path in args.images:
-            if Path(img_path).exists():
-                image_files.append(img_path)
-            else:
-                print(f"警告: 图像文件不存在: {img_path}")
-    
-    sensor_files = []
-    if args.sensors:
-        for sensor_path in args.sensors:
-            if Path(sensor_path).exists():
-                sensor_files.append(sensor_path)
-            else:
-                print(f"警告: 传感器文件不存在: {sensor_path}")
+    # 验证文件路径（每个目录只列举一次）
+    listings: Dict[Path, Set[str]] = {}
+    image_files = _existing_paths(args.images or [], "图像", listings)
+    sensor_files = _existing_paths(args.sensors or [], "传感器", listings)
     
     try:
         if args.async_mode:
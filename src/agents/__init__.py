@@ -2,18 +2,36 @@
 Agent模块
 """
 
-from .corrosion_agent import CorrosionDetectionAgent
-from .nodes import (
-    DataCollectionNode,
-    CorrosionAnalysisNode,
-    RiskAssessmentNode,
-    ReportGenerationNode
-)
+import importlib
+
+# 按需导入（PEP 562）：访问属性时才加载对应子模块及其OpenCV/NumPy依赖
+_LAZY_ATTRS = {
+    "CorrosionDetectionAgent": ".corrosion_agent",
+    "get_agent": ".corrosion_agent",
+    "DataCollectionNode": ".nodes",
+    "CorrosionAnalysisNode": ".nodes",
+    "RiskAssessmentNode": ".nodes",
+    "ReportGenerationNode": ".nodes"
+}
 
 __all__ = [
     "CorrosionDetectionAgent",
+    "get_agent",
     "DataCollectionNode",
     "CorrosionAnalysisNode", 
     "RiskAssessmentNode",
     "ReportGenerationNode"
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,40 @@
+"""
+节点数值计算
+腐蚀类型分类与置信度计算的标量数值内核，安装numba时JIT编译
+"""
+
+from ..utils._compat import njit
+
+
+# 腐蚀类型编码 -> 名称
+CORROSION_TYPE_NAMES = ("局部腐蚀", "点蚀", "均匀腐蚀")
+
+
+@njit(cache=True)
+def classify_type_code(n_boxes):
+    """按检测区域数量分类腐蚀类型，返回类型编码"""
+    if n_boxes == 1:
+        return 0
+    elif n_boxes > 3:
+        return 1
+    else:
+        return 2
+
+
+@njit(cache=True)
+def score(n_boxes, area):
+    """基于检测区域数量和面积计算置信度，返回 (置信度, 类型编码)"""
+    base_confidence = 0.7
+    
+    # 检测到的区域越多，置信度稍微降低
+    region_factor = max(0.1, 1.0 - n_boxes * 0.05)
+    
+    # 面积因子，归一化到1000平方毫米
+    area_factor = min(1.0, area / 1000.0)
+    
+    confidence = base_confidence * region_factor * (0.5 + 0.5 * area_factor)
+    return min(0.95, max(0.3, confidence)), classify_type_code(n_boxes)
+
+
+# 导入时预热JIT编译，避免首次检测时的编译延迟
+score(1, 1.0)
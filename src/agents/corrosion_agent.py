@@ -3,16 +3,21 @@
 基于LangGraph构建的多节点检测流程
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Union
 from datetime import datetime
+import asyncio
+import functools
+import time
 import uuid
 
+import numpy as np
+
 # 使用本地的模拟LangGraph实现
 # 强制使用mock版本以确保行为一致性
-from ..utils.mock_langgraph import StateGraph, END
+from ..utils.mock_langgraph import StateGraph, END, Send
 
-from ..models import AgentState, CorrosionLevel
-from ..config import config
+from ..models import AgentState, CorrosionLevel, CorrosionDetection
+from ..utils.image_processor import shared_image_processor
 from .nodes import (
     DataCollectionNode,
     CorrosionAnalysisNode, 
@@ -24,21 +29,43 @@ class CorrosionDetectionAgent:
     """腐蚀检测Agent主类"""
     
     def __init__(self):
-        self.graph = self._build_graph()
+        # 先构建节点（两个图像相关节点共用进程内共享的图像处理器），再基于它们构建工作流图
         self.nodes = {
-            "data_collection": DataCollectionNode(),
-            "corrosion_analysis": CorrosionAnalysisNode(),
+            "data_collection": DataCollectionNode(shared_image_processor),
+            "corrosion_analysis": CorrosionAnalysisNode(shared_image_processor),
             "risk_assessment": RiskAssessmentNode(),
             "report_generation": ReportGenerationNode()
         }
+        self.graph = self._build_graph(self.nodes)
+    
+    @staticmethod
+    def summarize_detections(detections: List[CorrosionDetection]) -> Dict[str, float]:
+        """汇总腐蚀检测统计量：一次性构建面积/深度数组后向量化计算"""
+        n = len(detections)
+        if n == 0:
+            return {"count": 0, "total_area": 0.0, "max_depth": 0.0, "mean_depth": 0.0}
+        
+        areas = np.fromiter((d.corrosion_area for d in detections), dtype=np.float64, count=n)
+        depths = np.fromiter((d.corrosion_depth for d in detections), dtype=np.float64, count=n)
+        return {
+            "count": n,
+            "total_area": float(areas.sum()),
+            "max_depth": float(depths.max()),
+            "mean_depth": float(depths.mean())
+        }
     
-    def _build_graph(self) -> StateGraph:
-        """构建Agent工作流图"""
+    def _build_graph(self, nodes: Dict[str, Any]) -> StateGraph:
+        """基于已构建的节点构建Agent工作流图"""
+        missing = {"data_collection", "corrosion_analysis", "risk_assessment", "report_generation"} - nodes.keys()
+        if missing:
+            raise ValueError(f"缺少工作流节点: {sorted(missing)}")
+        
         # 创建状态图
         workflow = StateGraph(AgentState)
         
         # 添加节点
         workflow.add_node("data_collection", self._data_collection_node)
+        workflow.add_node("analyze_one_image", self._analyze_one_image_node)
         workflow.add_node("corrosion_analysis", self._corrosion_analysis_node)
         workflow.add_node("risk_assessment", self._risk_assessment_node)
         workflow.add_node("report_generation", self._report_generation_node)
@@ -46,15 +73,16 @@ class CorrosionDetectionAgent:
         # 定义工作流路径
         workflow.set_entry_point("data_collection")
         
-        # 添加条件边
+        # 添加条件边：有图像时按图像派发并行分析分支，分支结果归并后进入腐蚀分析汇总
         workflow.add_conditional_edges(
             "data_collection",
-            self._should_continue_to_analysis,
+            self._dispatch_image_analysis,
             {
                 "continue": "corrosion_analysis",
                 "end": END
             }
         )
+        workflow.add_edge("analyze_one_image", "corrosion_analysis")
         
         workflow.add_conditional_edges(
             "corrosion_analysis", 
@@ -66,27 +94,20 @@ class CorrosionDetectionAgent:
             }
         )
         
-        workflow.add_conditional_edges(
-            "risk_assessment",
-            self._should_generate_report,
-            {
-                "generate": "report_generation",
-                "end": END
-            }
-        )
-        
+        # 总是生成报告，即使没有检测到腐蚀
+        workflow.add_edge("risk_assessment", "report_generation")
         workflow.add_edge("report_generation", END)
         
         return workflow.compile()
     
-    def _data_collection_node(self, state: AgentState) -> AgentState:
-        """数据收集节点"""
+    async def _data_collection_node(self, state: AgentState) -> AgentState:
+        """数据收集节点（图像文件并发处理）"""
         state.current_step = "data_collection"
-        state.last_update = datetime.now()
+        state.last_update_ns = time.monotonic_ns()
         
         try:
             # 执行数据收集
-            state = self.nodes["data_collection"].execute(state)
+            state = await self.nodes["data_collection"].aexecute(state)
             print(f"数据收集完成: 传感器数据 {len(state.sensor_readings)} 条, 图像数据 {len(state.processed_images)} 张")
         except Exception as e:
             state.errors.append(f"数据收集失败: {str(e)}")
@@ -94,14 +115,22 @@ class CorrosionDetectionAgent:
         
         return state
     
-    def _corrosion_analysis_node(self, state: AgentState) -> AgentState:
-        """腐蚀分析节点"""
+    async def _analyze_one_image_node(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """单张图像分析分支，返回的检测结果由状态的reducer归并"""
+        detection = await self.nodes["corrosion_analysis"].analyze_one(
+            payload["image"],
+            payload["inspection_area"]
+        )
+        return {"corrosion_detections": [detection] if detection else []}
+    
+    async def _corrosion_analysis_node(self, state: AgentState) -> AgentState:
+        """腐蚀分析节点（汇总各图像分支的检测结果）"""
         state.current_step = "corrosion_analysis"
-        state.last_update = datetime.now()
+        state.last_update_ns = time.monotonic_ns()
         
         try:
-            # 执行腐蚀分析
-            state = self.nodes["corrosion_analysis"].execute(state)
+            # 执行腐蚀分析汇总
+            state = await self.nodes["corrosion_analysis"].aggregate(state)
             print(f"腐蚀分析完成: 检测到 {len(state.corrosion_detections)} 个腐蚀点")
         except Exception as e:
             state.errors.append(f"腐蚀分析失败: {str(e)}")
@@ -109,14 +138,14 @@ class CorrosionDetectionAgent:
         
         return state
     
-    def _risk_assessment_node(self, state: AgentState) -> AgentState:
+    async def _risk_assessment_node(self, state: AgentState) -> AgentState:
         """风险评估节点"""
         state.current_step = "risk_assessment"
-        state.last_update = datetime.now()
+        state.last_update_ns = time.monotonic_ns()
         
         try:
             # 执行风险评估
-            state = self.nodes["risk_assessment"].execute(state)
+            state = await self.nodes["risk_assessment"].aexecute(state)
             risk_level = state.risk_assessment.corrosion_level if state.risk_assessment else "UNKNOWN"
             print(f"风险评估完成: 风险等级 {risk_level}")
         except Exception as e:
@@ -125,14 +154,16 @@ class CorrosionDetectionAgent:
         
         return state
     
-    def _report_generation_node(self, state: AgentState) -> AgentState:
+    async def _report_generation_node(self, state: AgentState) -> AgentState:
         """报告生成节点"""
         state.current_step = "report_generation"
+        # 墙上时钟时间只在报告生成时取一次，其余节点只记录单调时钟
+        state.last_update_ns = time.monotonic_ns()
         state.last_update = datetime.now()
         
         try:
             # 生成最终报告
-            state = self.nodes["report_generation"].execute(state)
+            state = await self.nodes["report_generation"].aexecute(state)
             print(f"报告生成完成: 报告ID {state.final_report.report_id if state.final_report else 'None'}")
         except Exception as e:
             state.errors.append(f"报告生成失败: {str(e)}")
@@ -151,6 +182,21 @@ class CorrosionDetectionAgent:
         
         return "continue"
     
+    def _dispatch_image_analysis(self, state: AgentState) -> Union[str, List[Send]]:
+        """数据收集后的路由：每张图像派发一个分析分支"""
+        decision = self._should_continue_to_analysis(state)
+        if decision != "continue" or not state.processed_images:
+            return decision
+        
+        return [
+            Send("analyze_one_image", {
+                "image": image,
+                "platform_id": state.platform_id,
+                "inspection_area": state.inspection_area
+            })
+            for image in state.processed_images
+        ]
+    
     def _should_continue_to_risk_assessment(self, state: AgentState) -> str:
         """判断是否继续到风险评估阶段"""
         if state.errors:
@@ -162,17 +208,15 @@ class CorrosionDetectionAgent:
         
         return "continue"
     
-    def _should_generate_report(self, state: AgentState) -> str:
-        """判断是否生成报告"""
-        # 总是生成报告，即使没有检测到腐蚀
-        return "generate"
-    
     async def run_inspection(self, 
                            platform_id: str,
                            inspection_area: str,
                            sensor_files: Optional[List[str]] = None,
                            image_files: Optional[List[str]] = None) -> AgentState:
-        """运行完整的检测流程"""
+        """运行完整的检测流程
+        
+        唯一的执行入口；同步调用方使用 asyncio.run(agent.run_inspection(...))。
+        """
         
         # 初始化状态
         initial_state = AgentState(
@@ -180,6 +224,7 @@ class CorrosionDetectionAgent:
             current_step="init",
             platform_id=platform_id,
             inspection_area=inspection_area,
+            sensor_files=sensor_files or [],
             image_files=image_files or [],
             start_time=datetime.now(),
             last_update=datetime.now()
@@ -187,9 +232,14 @@ class CorrosionDetectionAgent:
         
         print(f"开始检测流程: 平台 {platform_id}, 区域 {inspection_area}")
         
-        # 运行工作流
+        # 运行工作流，逐节点输出进度
         try:
-            final_state = await self.graph.ainvoke(initial_state)
+            final_state = initial_state
+            async for event in self.graph.astream(initial_state, stream_mode="updates"):
+                for node_name, node_output in event.items():
+                    print(f"节点完成: {node_name}")
+                    if isinstance(node_output, AgentState):
+                        final_state = node_output
             
             print(f"检测流程完成: 会话 {final_state.session_id}")
             
@@ -200,55 +250,20 @@ class CorrosionDetectionAgent:
                 
             return final_state
             
+        except asyncio.CancelledError:
+            print(f"检测流程已取消: 会话 {initial_state.session_id}")
+            raise
         except Exception as e:
             print(f"工作流执行失败: {e}")
             initial_state.errors.append(f"工作流执行失败: {str(e)}")
             return initial_state
+
+
+@functools.lru_cache(maxsize=1)
+def get_agent() -> CorrosionDetectionAgent:
+    """获取进程内共享的Agent实例
     
-    def run_inspection_sync(self, 
-                           platform_id: str,
-                           inspection_area: str,
-                           sensor_files: Optional[List[str]] = None,
-                           image_files: Optional[List[str]] = None) -> AgentState:
-        """同步运行检测流程"""
-        
-        # 初始化状态
-        initial_state = AgentState(
-            session_id=str(uuid.uuid4()),
-            current_step="init", 
-            platform_id=platform_id,
-            inspection_area=inspection_area,
-            image_files=image_files or [],
-            start_time=datetime.now(),
-            last_update=datetime.now()
-        )
-        
-        print(f"开始检测流程: 平台 {platform_id}, 区域 {inspection_area}")
-        
-        # 运行工作流
-        try:
-            final_state = self.graph.invoke(initial_state)
-            
-            # 检查返回的类型
-            print(f"工作流返回类型: {type(final_state)}")
-            
-            if isinstance(final_state, dict):
-                print(f"错误: 工作流返回了字典而不是AgentState对象")
-                print(f"字典内容: {list(final_state.keys()) if isinstance(final_state, dict) else 'N/A'}")
-                # 返回初始状态而不是字典
-                initial_state.errors.append("工作流返回了错误的数据类型")
-                return initial_state
-            
-            print(f"检测流程完成: 会话 {final_state.session_id}")
-            
-            if final_state.errors:
-                print(f"发现错误: {final_state.errors}")
-            if final_state.warnings:
-                print(f"警告信息: {final_state.warnings}")
-                
-            return final_state
-            
-        except Exception as e:
-            print(f"工作流执行失败: {e}")
-            initial_state.errors.append(f"工作流执行失败: {str(e)}")
-            return initial_state
\ No newline at end of file
+    工作流图和各节点只构建一次，多次检测复用同一实例；
+    节点不保存单次检测的状态，所有会话数据都在AgentState中传递。
+    """
+    return CorrosionDetectionAgent()
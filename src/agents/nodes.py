@@ -4,35 +4,105 @@
 """
 
 import os
+import asyncio
+import itertools
 import cv2
 import numpy as np
 import json
+import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 from pathlib import Path
+from dateutil.relativedelta import relativedelta
+from pydantic_core import PydanticSerializationError, to_json
 
 from ..models import (
     AgentState, SensorData, ImageData, SensorType, CorrosionDetection,
     RiskAssessment, CorrosionLevel, MaintenanceRecommendation, InspectionReport
 )
-from ..config import config
-from ..utils.image_processor import ImageProcessor
-from ..utils.sensor_reader import SensorReader
-from ..utils.llm_service import llm_service
+from ..config import get_config
+from ..utils.image_processor import (
+    ImageProcessor, shared_image_processor
+)
+from ..utils.sensor_reader import shared_sensor_reader
+from ..utils.llm_service import get_llm_service
+from ..utils._compat import ORJSON_AVAILABLE, orjson, run_blocking
+from ._nodes_numeric import CORROSION_TYPE_NAMES, score
+
+# 模块级随机数生成器，示例数据生成时复用
+_RNG = np.random.default_rng()
+
+# 示例图像（480x640）的行/列坐标网格，绘制腐蚀斑点时广播使用
+_YY, _XX = np.ogrid[:480, :640]
+
+# 检测结果面积/深度的结构化数组类型
+_AREA_DEPTH_DTYPE = np.dtype([("area", np.float64), ("depth", np.float64)])
+
+# JPEG编码参数：质量85并开启霍夫曼表优化，肉眼无差别但编码更快、文件更小
+_JPEG_PARAMS = [int(cv2.IMWRITE_JPEG_QUALITY), 85, int(cv2.IMWRITE_JPEG_OPTIMIZE), 1]
+
+
+def _dumps_value(value: Any) -> bytes:
+    """以orjson（未安装时用json）序列化单个值，无法识别的类型以str兜底"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(
+            value, default=str,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+    return json.dumps(value, ensure_ascii=False, indent=2, default=str).encode("utf-8")
+
+
+def _write_report(report: InspectionReport, path: Path):
+    """将报告以UTF-8 JSON写入文件
+    
+    优先用pydantic v2的C实现直接编码为bytes，不经过中间dict和str；报告中含有
+    无法直接序列化的值（如LLM分析结果中的numpy标量）时，逐个顶层字段编码并
+    流式写出，峰值内存只取决于最大的单个字段。
+    """
+    try:
+        data = to_json(report, indent=2)
+    except PydanticSerializationError:
+        pass
+    else:
+        path.write_bytes(data)
+        return
+    
+    with open(path, "wb", buffering=1 << 20) as f:
+        f.write(b"{")
+        for i, name in enumerate(type(report).model_fields):
+            value = report.model_dump(include={name})[name]
+            f.write(b",\n  " if i else b"\n  ")
+            f.write(_dumps_value(name))
+            f.write(b": ")
+            f.write(_dumps_value(value).replace(b"\n", b"\n  "))
+        f.write(b"\n}")
+
+
+def _sensor_arrays(readings: List[SensorData]) -> Dict[SensorType, np.ndarray]:
+    """单次遍历按传感器类型分组读数值，返回各类型的连续数组（SoA视图）"""
+    buckets: Dict[SensorType, List[float]] = {}
+    for reading in readings:
+        buckets.setdefault(reading.sensor_type, []).append(reading.value)
+    return {
+        sensor_type: np.fromiter(values, dtype=np.float64, count=len(values))
+        for sensor_type, values in buckets.items()
+    }
 
 class DataCollectionNode:
     """数据收集节点"""
     
-    def __init__(self):
-        self.image_processor = ImageProcessor()
-        self.sensor_reader = SensorReader()
+    def __init__(self, image_processor: Optional[ImageProcessor] = None):
+        self.image_processor = image_processor or shared_image_processor
+        self.sensor_reader = shared_sensor_reader
+        self._processed_dir: Optional[Path] = None
     
     def execute(self, state: AgentState) -> AgentState:
         """执行数据收集"""
         print("开始数据收集...")
         
         # 收集传感器数据
-        state = self._collect_sensor_data(state)
+        state = self._collect_sensor_data(state, self._read_sensor_files(state))
         
         # 处理图像数据
         state = self._process_image_data(state)
@@ -41,27 +111,86 @@ class DataCollectionNode:
         
         return state
     
-    def _collect_sensor_data(self, state: AgentState) -> AgentState:
-        """收集传感器数据"""
+    async def aexecute(self, state: AgentState) -> AgentState:
+        """异步执行数据收集，图像文件并发处理"""
+        print("开始数据收集...")
+        
+        # 收集传感器数据（传感器文件并发读取）
+        state = self._collect_sensor_data(state, await self._aread_sensor_files(state))
+        
+        # 并发处理图像数据
+        state = await self._aprocess_image_data(state)
+        
+        print(f"数据收集完成: {len(state.sensor_readings)} 个传感器读数, {len(state.processed_images)} 张图像")
+        
+        return state
+    
+    async def process_one(self, image_path: str, area: str,
+                          semaphore: asyncio.Semaphore) -> Optional[ImageData]:
+        """在并发上限内处理单张图像"""
+        async with semaphore:
+            return await run_blocking(self._process_single_image, image_path, area)
+    
+    def _existing_sensor_files(self, state: AgentState) -> List[str]:
+        """筛选存在的传感器数据文件，缺失的文件记录警告"""
+        existing_files = []
+        for sensor_file in state.sensor_files:
+            if os.path.exists(sensor_file):
+                existing_files.append(sensor_file)
+            else:
+                state.warnings.append(f"传感器文件不存在: {sensor_file}")
+        return existing_files
+    
+    def _read_sensor_files(self, state: AgentState) -> List[SensorData]:
+        """依次读取状态中的传感器数据文件"""
+        sensor_readings = []
+        for sensor_file in self._existing_sensor_files(state):
+            try:
+                sensor_readings.extend(self.sensor_reader.read_sensor_file(sensor_file))
+            except Exception as e:
+                state.warnings.append(f"传感器文件读取失败 {sensor_file}: {str(e)}")
+        return sensor_readings
+    
+    async def _aread_sensor_files(self, state: AgentState) -> List[SensorData]:
+        """并发读取状态中的传感器数据文件，读数按文件顺序合并"""
+        existing_files = self._existing_sensor_files(state)
+        if not existing_files:
+            return []
+        sensor_readings, errors = await self.sensor_reader.read_sensor_files(existing_files)
+        for sensor_file, error in errors:
+            state.warnings.append(f"传感器文件读取失败 {sensor_file}: {str(error)}")
+        return sensor_readings
+    
+    def _collect_sensor_data(self, state: AgentState,
+                             file_readings: Optional[List[SensorData]] = None) -> AgentState:
+        """收集传感器数据，有传感器文件读数时直接使用，否则生成模拟数据"""
+        if file_readings:
+            state.sensor_readings = file_readings
+            state.sensor_arrays = _sensor_arrays(file_readings)
+            return state
+        
         try:
             # 模拟从各种传感器收集数据
             # 在实际应用中，这里会连接到真实的传感器接口
             
             sensor_readings = []
+            # 同一轮采集的读数共用一个时间戳
+            now = datetime.now()
             
             # 厚度传感器数据
-            thickness_data = self._generate_thickness_readings(state.inspection_area)
+            thickness_data = self._generate_thickness_readings(state.inspection_area, now)
             sensor_readings.extend(thickness_data)
             
             # 环境传感器数据
-            environmental_data = self._generate_environmental_readings(state.inspection_area)
+            environmental_data = self._generate_environmental_readings(state.inspection_area, now)
             sensor_readings.extend(environmental_data)
             
             # 电化学传感器数据
-            electrochemical_data = self._generate_electrochemical_readings(state.inspection_area)
+            electrochemical_data = self._generate_electrochemical_readings(state.inspection_area, now)
             sensor_readings.extend(electrochemical_data)
             
             state.sensor_readings = sensor_readings
+            state.sensor_arrays = _sensor_arrays(sensor_readings)
             
         except Exception as e:
             state.errors.append(f"传感器数据收集失败: {str(e)}")
@@ -71,20 +200,56 @@ class DataCollectionNode:
     def _process_image_data(self, state: AgentState) -> AgentState:
         """处理图像数据"""
         try:
+            existing_files = []
+            for image_file in state.image_files:
+                if os.path.exists(image_file):
+                    existing_files.append(image_file)
+                else:
+                    state.warnings.append(f"图像文件不存在: {image_file}")
+            
             processed_images = []
+            if existing_files:
+                # cv2 解码/编码期间释放GIL，用线程池并行处理，结果保持输入顺序
+                workers = min(len(existing_files), get_config().max_io_concurrency)
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    results = executor.map(
+                        self._process_single_image, existing_files,
+                        itertools.repeat(state.inspection_area)
+                    )
+                    processed_images = [image_data for image_data in results if image_data]
             
+            # 如果没有提供图像文件，生成一些示例图像数据
+            if not processed_images:
+                sample_images = self._generate_sample_images(state.inspection_area)
+                processed_images.extend(sample_images)
+            
+            state.processed_images = processed_images
+            
+        except Exception as e:
+            state.errors.append(f"图像数据处理失败: {str(e)}")
+        
+        return state
+    
+    async def _aprocess_image_data(self, state: AgentState) -> AgentState:
+        """并发处理图像数据，结果按输入顺序串行合并到状态中"""
+        try:
+            semaphore = asyncio.Semaphore(get_config().max_io_concurrency)
+            existing_files = []
             for image_file in state.image_files:
                 if os.path.exists(image_file):
-                    # 处理单张图像
-                    image_data = self._process_single_image(image_file, state.inspection_area)
-                    if image_data:
-                        processed_images.append(image_data)
+                    existing_files.append(image_file)
                 else:
                     state.warnings.append(f"图像文件不存在: {image_file}")
             
+            results = await asyncio.gather(*(
+                self.process_one(image_file, state.inspection_area, semaphore)
+                for image_file in existing_files
+            ))
+            processed_images = [image_data for image_data in results if image_data]
+            
             # 如果没有提供图像文件，生成一些示例图像数据
             if not processed_images:
-                sample_images = self._generate_sample_images(state.inspection_area)
+                sample_images = await run_blocking(self._generate_sample_images, state.inspection_area)
                 processed_images.extend(sample_images)
             
             state.processed_images = processed_images
@@ -94,89 +259,86 @@ class DataCollectionNode:
         
         return state
     
-    def _generate_thickness_readings(self, area: str) -> List[SensorData]:
-        """生成厚度传感器读数"""
-        readings = []
+    def _generate_thickness_readings(self, area: str,
+                                     now: Optional[datetime] = None) -> List[SensorData]:
+        """生成厚度传感器读数（取值来自可信的随机数生成器，跳过pydantic校验）"""
         base_thickness = 12.0  # 基础厚度 mm
+        n_points = 5
         
-        # 在检测区域生成多个测量点
-        for i in range(5):
-            # 模拟不同程度的腐蚀
-            thickness_loss = np.random.uniform(0, 3.0)  # 0-3mm的厚度损失
-            current_thickness = base_thickness - thickness_loss
-            
-            reading = SensorData(
+        # 在检测区域生成多个测量点，一次性生成全部点的厚度损失与质量
+        losses = _RNG.uniform(0, 3.0, n_points)  # 0-3mm的厚度损失
+        thicknesses = (base_thickness - losses).tolist()
+        qualities = _RNG.uniform(0.8, 1.0, n_points).tolist()
+        timestamp = now or datetime.now()
+        
+        return [
+            SensorData.model_construct(
                 sensor_id=f"thickness_{area}_{i+1}",
                 sensor_type=SensorType.THICKNESS,
-                value=current_thickness,
+                value=thicknesses[i],
                 unit="mm",
-                timestamp=datetime.now(),
-                location={"x": i * 10, "y": 0, "z": 0},
-                quality=np.random.uniform(0.8, 1.0)
+                timestamp=timestamp,
+                location={"x": i * 10.0, "y": 0.0, "z": 0.0},
+                quality=qualities[i]
             )
-            readings.append(reading)
-        
-        return readings
+            for i in range(n_points)
+        ]
     
-    def _generate_environmental_readings(self, area: str) -> List[SensorData]:
-        """生成环境传感器读数"""
-        readings = []
-        
-        # 温度传感器
-        temp_reading = SensorData(
-            sensor_id=f"temp_{area}",
-            sensor_type=SensorType.TEMPERATURE,
-            value=np.random.uniform(15, 35),  # 15-35°C
-            unit="°C",
-            timestamp=datetime.now(),
-            location={"x": 0, "y": 0, "z": 0},
-            quality=0.95
-        )
-        readings.append(temp_reading)
-        
-        # 湿度传感器
-        humidity_reading = SensorData(
-            sensor_id=f"humidity_{area}",
-            sensor_type=SensorType.HUMIDITY,
-            value=np.random.uniform(60, 90),  # 60-90%
-            unit="%RH",
-            timestamp=datetime.now(),
-            location={"x": 0, "y": 0, "z": 0},
-            quality=0.92
-        )
-        readings.append(humidity_reading)
-        
-        # pH传感器
-        ph_reading = SensorData(
-            sensor_id=f"ph_{area}",
-            sensor_type=SensorType.PH,
-            value=np.random.uniform(7.5, 8.5),  # 海水pH
-            unit="pH",
-            timestamp=datetime.now(),
-            location={"x": 0, "y": 0, "z": 0},
-            quality=0.88
-        )
-        readings.append(ph_reading)
-        
-        return readings
+    def _generate_environmental_readings(self, area: str,
+                                         now: Optional[datetime] = None) -> List[SensorData]:
+        """生成环境传感器读数（跳过pydantic校验）"""
+        # 温度 15-35°C、湿度 60-90%、海水pH 7.5-8.5，一次取值
+        temperature, humidity, ph = _RNG.uniform((15, 60, 7.5), (35, 90, 8.5)).tolist()
+        timestamp = now or datetime.now()
+        
+        return [
+            # 温度传感器
+            SensorData.model_construct(
+                sensor_id=f"temp_{area}",
+                sensor_type=SensorType.TEMPERATURE,
+                value=temperature,
+                unit="°C",
+                timestamp=timestamp,
+                location={"x": 0.0, "y": 0.0, "z": 0.0},
+                quality=0.95
+            ),
+            # 湿度传感器
+            SensorData.model_construct(
+                sensor_id=f"humidity_{area}",
+                sensor_type=SensorType.HUMIDITY,
+                value=humidity,
+                unit="%RH",
+                timestamp=timestamp,
+                location={"x": 0.0, "y": 0.0, "z": 0.0},
+                quality=0.92
+            ),
+            # pH传感器
+            SensorData.model_construct(
+                sensor_id=f"ph_{area}",
+                sensor_type=SensorType.PH,
+                value=ph,
+                unit="pH",
+                timestamp=timestamp,
+                location={"x": 0.0, "y": 0.0, "z": 0.0},
+                quality=0.88
+            ),
+        ]
     
-    def _generate_electrochemical_readings(self, area: str) -> List[SensorData]:
-        """生成电化学传感器读数"""
-        readings = []
-        
+    def _generate_electrochemical_readings(self, area: str,
+                                           now: Optional[datetime] = None) -> List[SensorData]:
+        """生成电化学传感器读数（跳过pydantic校验）"""
         # 电导率传感器
-        conductivity_reading = SensorData(
+        conductivity_reading = SensorData.model_construct(
             sensor_id=f"conductivity_{area}",
             sensor_type=SensorType.CONDUCTIVITY,
-            value=np.random.uniform(50000, 55000),  # 海水电导率 μS/cm
+            value=float(_RNG.uniform(50000, 55000)),  # 海水电导率 μS/cm
             unit="μS/cm",
-            timestamp=datetime.now(),
-            location={"x": 0, "y": 0, "z": 0},
+            timestamp=now or datetime.now(),
+            location={"x": 0.0, "y": 0.0, "z": 0.0},
             quality=0.90
         )
-        readings.append(conductivity_reading)
         
-        return readings
+        return [conductivity_reading]
     
     def _process_single_image(self, image_path: str, area: str) -> Optional[ImageData]:
         """处理单张图像"""
@@ -192,21 +354,27 @@ class DataCollectionNode:
             # 图像预处理
             processed_image = self.image_processor.preprocess(image)
             
-            # 保存处理后的图像
-            processed_path = self._save_processed_image(processed_image, image_path, area)
+            # 保存处理后的图像（可关闭，省去JPEG编码与写盘）
+            if get_config().persist_processed_images:
+                processed_path = self._save_processed_image(processed_image, image_path, area, image)
+            else:
+                processed_path = image_path
             
+            now = datetime.now()
             image_data = ImageData(
-                image_id=f"img_{area}_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+                image_id=f"img_{area}_{now.strftime('%Y%m%d_%H%M%S')}",
                 file_path=processed_path,
-                timestamp=datetime.now(),
+                timestamp=now,
                 location={"x": 0, "y": 0, "z": 0},
                 resolution={"width": width, "height": height},
                 metadata={
                     "original_path": image_path,
                     "file_size": os.path.getsize(image_path),
-                    "processed": True
+                    "processed": get_config().persist_processed_images
                 }
             )
+            # 附加预处理结果，分析节点直接复用，无需再次读取解码
+            image_data.attach_pixels(processed_image)
             
             return image_data
             
@@ -214,77 +382,95 @@ class DataCollectionNode:
             print(f"图像处理失败 {image_path}: {e}")
             return None
     
-    def _save_processed_image(self, image: np.ndarray, original_path: str, area: str) -> str:
+    def _processed_images_dir(self) -> Path:
+        """返回处理后图像的输出目录，只在首次使用时创建"""
+        if self._processed_dir is None:
+            output_dir = Path(get_config().output_path) / "processed_images"
+            output_dir.mkdir(parents=True, exist_ok=True)
+            self._processed_dir = output_dir
+        return self._processed_dir
+    
+    def _save_processed_image(self, image: np.ndarray, original_path: str, area: str,
+                              original: Optional[np.ndarray] = None) -> str:
         """保存处理后的图像"""
-        # 创建输出目录
-        output_dir = Path(config.output_path) / "processed_images"
-        output_dir.mkdir(parents=True, exist_ok=True)
+        output_dir = self._processed_images_dir()
         
         # 生成输出文件名
         original_name = Path(original_path).stem
         output_path = output_dir / f"{original_name}_{area}_processed.jpg"
         
-        # 保存图像
-        cv2.imwrite(str(output_path), image)
+        # 预处理未改变图像时直接复制原文件，避免重新编码
+        if image is original and Path(original_path).suffix.lower() in (".jpg", ".jpeg"):
+            shutil.copyfile(original_path, output_path)
+        else:
+            cv2.imwrite(str(output_path), image, _JPEG_PARAMS)
         
         return str(output_path)
     
-    def _generate_sample_images(self, area: str) -> List[ImageData]:
+    def _generate_sample_images(self, area: str, count: int = 3) -> List[ImageData]:
         """生成示例图像数据（用于演示）"""
-        sample_images = []
+        now = datetime.now()
+        output_dir = Path(get_config().output_path) / "sample_images"
+        output_dir.mkdir(parents=True, exist_ok=True)
         
-        # 创建一些模拟的图像数据
-        for i in range(3):
-            # 生成模拟图像
-            image = self._create_sample_corrosion_image()
-            
-            # 保存图像
-            output_dir = Path(config.output_path) / "sample_images" 
-            output_dir.mkdir(parents=True, exist_ok=True)
-            image_path = output_dir / f"sample_{area}_{i+1}.jpg"
-            
-            cv2.imwrite(str(image_path), image)
-            
-            image_data = ImageData(
+        # 一次生成全部模拟图像
+        images = self._create_sample_corrosion_images(count)
+        image_paths = [str(output_dir / f"sample_{area}_{i+1}.jpg") for i in range(count)]
+        
+        # 并行编码写盘（cv2.imwrite 期间释放GIL）
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            list(executor.map(cv2.imwrite, image_paths, images, itertools.repeat(_JPEG_PARAMS)))
+        
+        sample_images = []
+        for i, (image_path, image) in enumerate(zip(image_paths, images)):
+            image_data = ImageData.model_construct(
                 image_id=f"sample_{area}_{i+1}",
-                file_path=str(image_path),
-                timestamp=datetime.now(),
-                location={"x": i * 50, "y": 0, "z": 0},
+                file_path=image_path,
+                timestamp=now,
+                location={"x": i * 50.0, "y": 0.0, "z": 0.0},
                 resolution={"width": 640, "height": 480},
                 metadata={
                     "type": "sample",
                     "generated": True
                 }
             )
+            image_data.attach_pixels(image)
             sample_images.append(image_data)
         
         return sample_images
     
     def _create_sample_corrosion_image(self) -> np.ndarray:
         """创建示例腐蚀图像"""
+        return self._create_sample_corrosion_images(1)[0]
+    
+    def _create_sample_corrosion_images(self, count: int) -> np.ndarray:
+        """批量创建示例腐蚀图像，返回形状为 (count, 480, 640, 3) 的数组"""
         # 创建640x480的基础图像（钢铁表面）
-        image = np.random.randint(80, 120, (480, 640, 3), dtype=np.uint8)
+        images = _RNG.integers(80, 120, size=(count, 480, 640, 3), dtype=np.uint8)
         
         # 添加一些腐蚀特征
-        # 添加铁锈色斑点
-        for _ in range(np.random.randint(3, 8)):
-            center = (np.random.randint(50, 590), np.random.randint(50, 430))
-            radius = np.random.randint(10, 30)
-            color = (20, 50, 180)  # 橙红色（BGR格式）
-            cv2.circle(image, center, radius, color, -1)
-        
-        # 添加一些表面纹理
-        noise = np.random.randint(-20, 20, image.shape, dtype=np.int16)
-        image = np.clip(image.astype(np.int16) + noise, 0, 255).astype(np.uint8)
-        
-        return image
+        # 添加铁锈色斑点：一次生成全部图像的斑点数量、圆心坐标与半径，每张图取前 n 个
+        # 用预先构建的坐标网格计算到各圆心的距离，一次得到全部斑点的并集掩码
+        n_spots = _RNG.integers(3, 8, size=count).tolist()
+        spots = _RNG.integers((50, 50, 10), (590, 430, 30), size=(count, 7, 3))
+        color = (20, 50, 180)  # 橙红色（BGR格式）
+        for image, n, image_spots in zip(images, n_spots, spots):
+            cx, cy, radius = (image_spots[:n, k, None, None] for k in range(3))
+            mask = ((_XX - cx) ** 2 + (_YY - cy) ** 2 <= radius * radius).any(axis=0)
+            image[mask] = color
+        
+        # 添加一些表面纹理（在斑点之后叠加，斑点同样带纹理）
+        noise = _RNG.integers(-20, 20, size=images.shape, dtype=np.int16)
+        images = np.clip(images.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+        
+        return images
 
 
 class CorrosionAnalysisNode:
     """腐蚀分析节点"""
     
-    def __init__(self):
-        self.image_processor = ImageProcessor()
+    def __init__(self, image_processor: Optional[ImageProcessor] = None):
+        self.image_processor = image_processor or shared_image_processor
     
     def execute(self, state: AgentState) -> AgentState:
         """执行腐蚀分析"""
@@ -292,21 +478,52 @@ class CorrosionAnalysisNode:
         
         detections = []
         
-        # 分析每张图像
-        for image_data in state.processed_images:
-            detection = self._analyze_image(image_data, state.inspection_area)
-            if detection:
-                detections.append(detection)
+        # 分析每张图像：cv2 运算期间释放GIL，用线程池并行分析，结果保持输入顺序
+        # _analyze_image 自行捕获异常，ImageProcessor 无可变状态，可在线程间共享
+        if state.processed_images:
+            workers = min(len(state.processed_images), get_config().max_io_concurrency)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = executor.map(
+                    self._analyze_image, state.processed_images,
+                    itertools.repeat(state.inspection_area)
+                )
+                detections = [detection for detection in results if detection]
         
         # 结合传感器数据进行分析
-        enhanced_detections = self._enhance_with_sensor_data(detections, state.sensor_readings)
+        enhanced_detections = self._enhance_with_sensor_data(
+            detections, state.sensor_readings, state.sensor_arrays or None
+        )
         
         # 使用LLM进行增强分析
         llm_analysis = self._perform_llm_analysis(enhanced_detections, state.sensor_readings)
         
+        return self._merge_results(state, detections, enhanced_detections, llm_analysis)
+    
+    async def aggregate(self, state: AgentState) -> AgentState:
+        """汇总图分支已逐图分析得到的检测结果，再结合传感器数据和LLM增强"""
+        print("开始腐蚀分析汇总...")
+        
+        detections = list(state.corrosion_detections)
+        
+        # 结合传感器数据进行分析
+        enhanced_detections = self._enhance_with_sensor_data(
+            detections, state.sensor_readings, state.sensor_arrays or None
+        )
+        
+        # 使用LLM进行增强分析
+        llm_analysis = await self._aperform_llm_analysis(enhanced_detections, state.sensor_readings)
+        
+        return self._merge_results(state, detections, enhanced_detections, llm_analysis)
+    
+    async def analyze_one(self, image_data: ImageData, area: str) -> Optional[CorrosionDetection]:
+        """在线程池中分析单张图像，不阻塞事件循环"""
+        return await run_blocking(self._analyze_image, image_data, area)
+    
+    def _merge_results(self, state: AgentState, detections: List[CorrosionDetection],
+                       enhanced_detections: List[CorrosionDetection],
+                       llm_analysis: Dict[str, Any]) -> AgentState:
+        """将分析结果合并到状态中"""
         # 将LLM分析结果添加到状态中
-        if not hasattr(state, 'llm_analysis'):
-            state.llm_analysis = {}
         state.llm_analysis.update(llm_analysis)
         
         state.corrosion_detections = enhanced_detections
@@ -320,29 +537,28 @@ class CorrosionAnalysisNode:
     def _analyze_image(self, image_data: ImageData, area: str) -> Optional[CorrosionDetection]:
         """分析单张图像"""
         try:
-            # 读取图像
-            import cv2
-            image = cv2.imread(image_data.file_path)
+            # 优先复用数据收集阶段附加的图像，没有时再从磁盘读取
+            image = image_data.take_pixels()
             if image is None:
-                return None
+                image = cv2.imread(image_data.file_path)
+                if image is None:
+                    return None
+                if not image_data.metadata.get("processed", True):
+                    # 磁盘上只有原图，需要重新预处理
+                    image = self.image_processor.preprocess(image)
             
-            # 检测腐蚀特征
-            bounding_boxes = self.image_processor.detect_corrosion_features(image)
+            # 检测腐蚀特征，并计算腐蚀面积和深度
+            bounding_boxes, corrosion_area, corrosion_depth = self.image_processor.analyze_image(image)
             
             if not bounding_boxes:
                 return None
             
-            # 计算腐蚀面积和深度
-            corrosion_area = self.image_processor.calculate_corrosion_area(image, bounding_boxes)
-            corrosion_depth = self.image_processor.estimate_corrosion_depth(image, bounding_boxes)
-            
-            # 确定腐蚀类型
-            corrosion_type = self._classify_corrosion_type(image, bounding_boxes)
+            # 计算置信度并确定腐蚀类型
+            confidence, type_code = score(len(bounding_boxes), float(corrosion_area))
+            corrosion_type = CORROSION_TYPE_NAMES[type_code]
             
-            # 计算置信度
-            confidence = self._calculate_confidence(bounding_boxes, corrosion_area)
-            
-            detection = CorrosionDetection(
+            # 各字段均由本模块计算得到（置信度已限定在[0.3, 0.95]），跳过校验
+            detection = CorrosionDetection.model_construct(
                 detection_id=f"detection_{image_data.image_id}",
                 image_id=image_data.image_id,
                 corrosion_area=corrosion_area,
@@ -359,77 +575,63 @@ class CorrosionAnalysisNode:
             print(f"图像分析失败 {image_data.file_path}: {e}")
             return None
     
-    def _classify_corrosion_type(self, image: np.ndarray, bounding_boxes: List) -> str:
-        """分类腐蚀类型"""
-        # 简化的腐蚀类型分类
-        if len(bounding_boxes) == 1:
-            return "局部腐蚀"
-        elif len(bounding_boxes) > 3:
-            return "点蚀"
-        else:
-            return "均匀腐蚀"
-    
-    def _calculate_confidence(self, bounding_boxes: List, area: float) -> float:
-        """计算检测置信度"""
-        # 基于检测区域数量和面积的置信度计算
-        base_confidence = 0.7
-        
-        # 检测到的区域越多，置信度稍微降低
-        region_factor = max(0.1, 1.0 - len(bounding_boxes) * 0.05)
-        
-        # 面积因子
-        area_factor = min(1.0, area / 1000.0)  # 归一化到1000平方毫米
-        
-        confidence = base_confidence * region_factor * (0.5 + 0.5 * area_factor)
-        return min(0.95, max(0.3, confidence))
-    
     def _enhance_with_sensor_data(self, detections: List[CorrosionDetection], 
-                                sensor_readings: List[SensorData]) -> List[CorrosionDetection]:
+                                sensor_readings: List[SensorData],
+                                sensor_arrays: Optional[Dict[SensorType, np.ndarray]] = None
+                                ) -> List[CorrosionDetection]:
         """使用传感器数据增强检测结果"""
+        if sensor_arrays is None:
+            sensor_arrays = _sensor_arrays(sensor_readings)
+        
         # 获取厚度传感器数据
-        thickness_readings = [r for r in sensor_readings if r.sensor_type == SensorType.THICKNESS]
+        thickness_values = sensor_arrays.get(SensorType.THICKNESS)
         
-        if not thickness_readings:
+        if thickness_values is None or not thickness_values.size:
             return detections
         
-        # 使用厚度传感器数据增强检测结果
-        enhanced_detections = []
-        for detection in detections:
-            # 计算平均厚度损失
-            avg_thickness = np.mean([r.value for r in thickness_readings])
-            base_thickness = 12.0  # 基本厚度 mm
-            thickness_loss = base_thickness - avg_thickness
-            
-            # 调整腐蚀深度估计
-            adjusted_depth = max(detection.corrosion_depth, thickness_loss * 0.8)
-            
-            # 创建增强的检测结果
-            enhanced_detection = CorrosionDetection(
-                detection_id=detection.detection_id,
-                image_id=detection.image_id,
-                corrosion_area=detection.corrosion_area,
-                corrosion_depth=adjusted_depth,
-                corrosion_type=detection.corrosion_type,
-                confidence=min(0.95, detection.confidence + 0.05),  # 略微提高置信度
-                bounding_boxes=detection.bounding_boxes,
-                timestamp=detection.timestamp
-            )
-            enhanced_detections.append(enhanced_detection)
-        
-        return enhanced_detections
+        # 平均厚度损失对所有检测结果相同，只需计算一次
+        avg_thickness = float(thickness_values.mean())
+        base_thickness = 12.0  # 基本厚度 mm
+        thickness_loss = base_thickness - avg_thickness
+        
+        # 向量化调整腐蚀深度估计，并略微提高置信度
+        n = len(detections)
+        depths = np.fromiter((d.corrosion_depth for d in detections), dtype=np.float64, count=n)
+        confidences = np.fromiter((d.confidence for d in detections), dtype=np.float64, count=n)
+        adjusted_depths = np.maximum(depths, thickness_loss * 0.8).tolist()
+        adjusted_confidences = np.minimum(0.95, confidences + 0.05).tolist()
+        
+        # 基于原结果复制出增强的检测结果，跳过完整的字段校验
+        return [
+            detection.model_copy(update={"corrosion_depth": depth, "confidence": confidence})
+            for detection, depth, confidence in zip(detections, adjusted_depths, adjusted_confidences)
+        ]
     
     def _perform_llm_analysis(self, detections: List[CorrosionDetection], 
                             sensor_readings: List[SensorData]) -> Dict[str, Any]:
         """使用LLM进行增强分析"""
         try:
-            analysis_result = llm_service.analyze_corrosion_data(sensor_readings, detections)
+            analysis_result = get_llm_service().analyze_corrosion_data(sensor_readings, detections)
             return analysis_result
         except Exception as e:
             print(f"⚠️ LLM分析失败: {e}")
-            return {
-                "severity_assessment": "基于传统方法的分析",
-                "technical_insights": "使用传统图像处理和传感器数据分析"
-            }
+            return self._traditional_analysis()
+    
+    async def _aperform_llm_analysis(self, detections: List[CorrosionDetection],
+                                     sensor_readings: List[SensorData]) -> Dict[str, Any]:
+        """_perform_llm_analysis 的异步版本"""
+        try:
+            return await get_llm_service().aanalyze_corrosion_data(sensor_readings, detections)
+        except Exception as e:
+            print(f"⚠️ LLM分析失败: {e}")
+            return self._traditional_analysis()
+    
+    def _traditional_analysis(self) -> Dict[str, Any]:
+        """LLM分析失败时的传统分析结果"""
+        return {
+            "severity_assessment": "基于传统方法的分析",
+            "technical_insights": "使用传统图像处理和传感器数据分析"
+        }
 
 
 class RiskAssessmentNode:
@@ -440,8 +642,8 @@ class RiskAssessmentNode:
         print("开始风险评估...")
         
         if not state.corrosion_detections:
-            # 没有检测到腐蚀，风险较低
-            risk_assessment = RiskAssessment(
+            # 没有检测到腐蚀，风险较低（固定取值，跳过校验）
+            risk_assessment = RiskAssessment.model_construct(
                 assessment_id=f"risk_{state.session_id}",
                 corrosion_level=CorrosionLevel.LOW,
                 risk_score=0.1,
@@ -451,7 +653,9 @@ class RiskAssessmentNode:
                 timestamp=datetime.now()
             )
         else:
-            risk_assessment = self._assess_risk(state.corrosion_detections, state.sensor_readings)
+            risk_assessment = self._assess_risk(
+                state.corrosion_detections, state.sensor_readings, state.sensor_arrays or None
+            )
         
         state.risk_assessment = risk_assessment
         
@@ -459,19 +663,78 @@ class RiskAssessmentNode:
         
         return state
     
+    async def aexecute(self, state: AgentState) -> AgentState:
+        """异步执行风险评估
+        
+        基础评估在线程池中完成后，维护洞察与报告摘要两次LLM调用并发发出，总等待时间取决于较慢的一次；
+        摘要提示词只用到风险等级、评分与紧急程度，不依赖维护洞察。LLM未生成摘要时，
+        回退摘要基于合并了维护洞察的评估生成，与同步路径一致。摘要暂存到state.enhanced_summary供报告节点使用。
+        """
+        if not state.corrosion_detections:
+            return await run_blocking(self.execute, state)
+        
+        print("开始风险评估...")
+        
+        risk_assessment = await run_blocking(
+            self._assess_risk, state.corrosion_detections, state.sensor_readings,
+            state.sensor_arrays or None, False
+        )
+        
+        llm_service = get_llm_service()
+        base_recommendations = risk_assessment.recommendations
+        insights, summary = await asyncio.gather(
+            llm_service.agenerate_maintenance_insights(
+                self._insights_assessment(risk_assessment.corrosion_level, risk_assessment.risk_score, base_recommendations)
+            ),
+            llm_service.agenerate_enhanced_report_summary(
+                state.sensor_readings, state.corrosion_detections, risk_assessment,
+                state.platform_id, state.inspection_area, fallback=False
+            ),
+            return_exceptions=True
+        )
+        
+        if isinstance(insights, Exception):
+            print(f"⚠️ LLM建议增强失败: {insights}")
+            insights = None
+        recommendations = self._select_recommendations(insights, base_recommendations)
+        state.risk_assessment = risk_assessment.model_copy(update={"recommendations": recommendations})
+        
+        if isinstance(summary, Exception):
+            print(f"⚠️ LLM摘要增强失败: {summary}")
+            summary = None
+        if summary is None:
+            # 回退摘要引用首条建议，需基于合并后的评估生成
+            summary = llm_service.fallback_summary(
+                state.sensor_readings, state.corrosion_detections, state.risk_assessment,
+                state.platform_id, state.inspection_area
+            )
+        state.enhanced_summary = summary
+        
+        print(f"风险评估完成: 风险等级 {risk_assessment.corrosion_level.value}")
+        
+        return state
+    
     def _assess_risk(self, detections: List[CorrosionDetection], 
-                    sensor_readings: List[SensorData]) -> RiskAssessment:
-        """评估腐蚀风险"""
+                    sensor_readings: List[SensorData],
+                    sensor_arrays: Optional[Dict[SensorType, np.ndarray]] = None,
+                    enhance_with_llm: bool = True) -> RiskAssessment:
+        """评估腐蚀风险（enhance_with_llm为False时不调用LLM，直接使用基础建议）"""
         # 计算各种风险因子
         factors = {}
         
+        # 一次遍历取出面积与深度，再做向量化归约
+        values = np.fromiter(
+            ((d.corrosion_area, d.corrosion_depth) for d in detections),
+            dtype=_AREA_DEPTH_DTYPE, count=len(detections)
+        )
+        
         # 腐蚀面积因子
-        total_area = sum(d.corrosion_area for d in detections)
+        total_area = float(values["area"].sum())
         area_factor = min(1.0, total_area / 5000.0)  # 归一化到5000平方毫米
         factors["corrosion_area"] = area_factor
         
         # 腐蚀深度因子
-        max_depth = max(d.corrosion_depth for d in detections)
+        max_depth = float(values["depth"].max())
         depth_factor = min(1.0, max_depth / 3.0)  # 归一化到3毫米
         factors["corrosion_depth"] = depth_factor
         
@@ -480,7 +743,7 @@ class RiskAssessmentNode:
         factors["corrosion_count"] = count_factor
         
         # 环境因子
-        env_factor = self._calculate_environmental_factor(sensor_readings)
+        env_factor = self._calculate_environmental_factor(sensor_readings, sensor_arrays)
         factors["environmental"] = env_factor
         
         # 计算综合风险评分
@@ -498,46 +761,54 @@ class RiskAssessmentNode:
         recommendations = self._generate_recommendations(corrosion_level, factors)
         
         # 使用LLM增强建议
-        enhanced_recommendations = self._enhance_recommendations_with_llm(corrosion_level, risk_score, recommendations)
+        if enhance_with_llm:
+            enhanced_recommendations = self._enhance_recommendations_with_llm(corrosion_level, risk_score, recommendations)
+        else:
+            enhanced_recommendations = recommendations
         
         # 确定紧急程度
         urgency = self._determine_urgency(corrosion_level, max_depth)
         
-        return RiskAssessment(
-            assessment_id=f"risk_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+        # 各因子与评分均已限定在[0, 1]内，跳过校验
+        now = datetime.now()
+        return RiskAssessment.model_construct(
+            assessment_id=f"risk_{now.strftime('%Y%m%d_%H%M%S')}",
             corrosion_level=corrosion_level,
             risk_score=risk_score,
             factors=factors,
             recommendations=enhanced_recommendations,
             urgency=urgency,
-            timestamp=datetime.now()
+            timestamp=now
         )
     
-    def _calculate_environmental_factor(self, sensor_readings: List[SensorData]) -> float:
+    def _calculate_environmental_factor(self, sensor_readings: List[SensorData],
+                                      sensor_arrays: Optional[Dict[SensorType, np.ndarray]] = None) -> float:
         """计算环境因子"""
         if not sensor_readings:
             return 0.5  # 默认中等环境风险
         
         env_score = 0.0
+        if sensor_arrays is None:
+            sensor_arrays = _sensor_arrays(sensor_readings)
         
         # 温度因子
-        temp_readings = [r for r in sensor_readings if r.sensor_type == SensorType.TEMPERATURE]
-        if temp_readings:
-            avg_temp = np.mean([r.value for r in temp_readings])
+        temp_values = sensor_arrays.get(SensorType.TEMPERATURE)
+        if temp_values is not None and temp_values.size:
+            avg_temp = float(temp_values.mean())
             temp_score = min(1.0, (avg_temp - 15) / 20.0)  # 15-35°C范围
             env_score += temp_score * 0.3
         
         # 湿度因子
-        humidity_readings = [r for r in sensor_readings if r.sensor_type == SensorType.HUMIDITY]
-        if humidity_readings:
-            avg_humidity = np.mean([r.value for r in humidity_readings])
+        humidity_values = sensor_arrays.get(SensorType.HUMIDITY)
+        if humidity_values is not None and humidity_values.size:
+            avg_humidity = float(humidity_values.mean())
             humidity_score = min(1.0, (avg_humidity - 60) / 30.0)  # 60-90%范围
             env_score += humidity_score * 0.4
         
         # pH因子
-        ph_readings = [r for r in sensor_readings if r.sensor_type == SensorType.PH]
-        if ph_readings:
-            avg_ph = np.mean([r.value for r in ph_readings])
+        ph_values = sensor_arrays.get(SensorType.PH)
+        if ph_values is not None and ph_values.size:
+            avg_ph = float(ph_values.mean())
             ph_score = abs(avg_ph - 8.0) / 2.0  # 偏离中性pH 8.0的程度
             env_score += min(1.0, ph_score) * 0.3
         
@@ -545,14 +816,7 @@ class RiskAssessmentNode:
     
     def _determine_risk_level(self, risk_score: float) -> CorrosionLevel:
         """确定风险等级"""
-        if risk_score < config.low_risk_threshold:
-            return CorrosionLevel.LOW
-        elif risk_score < config.medium_risk_threshold:
-            return CorrosionLevel.MEDIUM
-        elif risk_score < config.high_risk_threshold:
-            return CorrosionLevel.HIGH
-        else:
-            return CorrosionLevel.CRITICAL
+        return CorrosionLevel(get_config().get_risk_level(risk_score))
     
     def _generate_recommendations(self, level: CorrosionLevel, factors: Dict[str, float]) -> List[str]:
         """生成维护建议"""
@@ -605,29 +869,34 @@ class RiskAssessmentNode:
                                          base_recommendations: List[str]) -> List[str]:
         """使用LLM增强维护建议"""
         try:
-            # 创建临时风险评估对象用于LLM调用
-            temp_assessment = RiskAssessment(
-                assessment_id="temp",
-                corrosion_level=level,
-                risk_score=risk_score,
-                factors={"estimated": risk_score},  # 添加必需的factors字段
-                recommendations=base_recommendations,
-                urgency="中等",
-                timestamp=datetime.now()
-            )
-            
-            enhanced_recommendations = llm_service.generate_maintenance_insights(temp_assessment)
-            
-            # 如果LLM生成了新建议，使用增强建议；否则使用基础建议
-            if enhanced_recommendations and len(enhanced_recommendations) > 0:
-                print(f"🤖 LLM增强维护建议: {len(enhanced_recommendations)}条")
-                return enhanced_recommendations
-            else:
-                return base_recommendations
+            temp_assessment = self._insights_assessment(level, risk_score, base_recommendations)
+            enhanced_recommendations = get_llm_service().generate_maintenance_insights(temp_assessment)
+            return self._select_recommendations(enhanced_recommendations, base_recommendations)
                 
         except Exception as e:
             print(f"⚠️ LLM建议增强失败: {e}")
             return base_recommendations
+    
+    def _insights_assessment(self, level: CorrosionLevel, risk_score: float,
+                             base_recommendations: List[str]) -> RiskAssessment:
+        """创建临时风险评估对象用于LLM调用（入参来自_assess_risk，跳过校验）"""
+        return RiskAssessment.model_construct(
+            assessment_id="temp",
+            corrosion_level=level,
+            risk_score=risk_score,
+            factors={"estimated": risk_score},  # 添加必需的factors字段
+            recommendations=base_recommendations,
+            urgency="中等",
+            timestamp=datetime.now()
+        )
+    
+    def _select_recommendations(self, enhanced_recommendations: Optional[List[str]],
+                                base_recommendations: List[str]) -> List[str]:
+        """如果LLM生成了新建议，使用增强建议；否则使用基础建议"""
+        if enhanced_recommendations and len(enhanced_recommendations) > 0:
+            print(f"🤖 LLM增强维护建议: {len(enhanced_recommendations)}条")
+            return enhanced_recommendations
+        return base_recommendations
 
 
 class ReportGenerationNode:
@@ -649,8 +918,8 @@ class ReportGenerationNode:
         # 确定下次检测时间
         next_inspection = self._calculate_next_inspection_date(state.risk_assessment)
         
-        # 创建最终报告
-        report = InspectionReport(
+        # 创建最终报告（各部分均为已构建好的模型对象，跳过重复校验）
+        report = InspectionReport.model_construct(
             report_id=f"report_{state.session_id}",
             timestamp=datetime.now(),
             inspector="Corrosion Detection Agent",
@@ -674,6 +943,10 @@ class ReportGenerationNode:
         
         return state
     
+    async def aexecute(self, state: AgentState) -> AgentState:
+        """异步执行报告生成（LLM调用和报告写盘放到线程池）"""
+        return await run_blocking(self.execute, state)
+    
     def _generate_maintenance_recommendations(self, state: AgentState) -> List[MaintenanceRecommendation]:
         """生成维护建议"""
         recommendations = []
@@ -683,8 +956,9 @@ class ReportGenerationNode:
         
         level = state.risk_assessment.corrosion_level
         
+        # 以下建议均为固定取值，跳过校验
         if level == CorrosionLevel.LOW:
-            rec = MaintenanceRecommendation(
+            rec = MaintenanceRecommendation.model_construct(
                 recommendation_id="maint_001",
                 priority=2,
                 action_type="预防性维护",
@@ -696,7 +970,7 @@ class ReportGenerationNode:
             recommendations.append(rec)
         
         elif level in [CorrosionLevel.MEDIUM, CorrosionLevel.HIGH]:
-            rec1 = MaintenanceRecommendation(
+            rec1 = MaintenanceRecommendation.model_construct(
                 recommendation_id="maint_002",
                 priority=3,
                 action_type="修复性维护",
@@ -708,7 +982,7 @@ class ReportGenerationNode:
             recommendations.append(rec1)
             
             if level == CorrosionLevel.HIGH:
-                rec2 = MaintenanceRecommendation(
+                rec2 = MaintenanceRecommendation.model_construct(
                     recommendation_id="maint_003",
                     priority=4,
                     action_type="结构加固",
@@ -720,7 +994,7 @@ class ReportGenerationNode:
                 recommendations.append(rec2)
         
         elif level == CorrosionLevel.CRITICAL:
-            rec = MaintenanceRecommendation(
+            rec = MaintenanceRecommendation.model_construct(
                 recommendation_id="maint_004",
                 priority=5,
                 action_type="紧急维修",
@@ -765,9 +1039,9 @@ class ReportGenerationNode:
         return "\n".join(summary_parts)
     
     def _generate_enhanced_summary(self, state: AgentState, base_summary: str) -> str:
-        """使用LLM生成增强的报告摘要"""
+        """使用LLM生成增强的报告摘要（风险评估阶段已预生成时直接使用）"""
         try:
-            enhanced_summary = llm_service.generate_enhanced_report_summary(
+            enhanced_summary = state.enhanced_summary or get_llm_service().generate_enhanced_report_summary(
                 state.sensor_readings,
                 state.corrosion_detections,
                 state.risk_assessment,
@@ -787,8 +1061,6 @@ class ReportGenerationNode:
     
     def _calculate_next_inspection_date(self, risk_assessment: Optional[RiskAssessment]) -> datetime:
         """计算下次检测日期"""
-        from dateutil.relativedelta import relativedelta
-        
         current_date = datetime.now()
         
         if not risk_assessment:
@@ -809,13 +1081,12 @@ class ReportGenerationNode:
         """保存报告到文件"""
         try:
             # 创建输出目录
-            output_dir = Path(config.output_path) / "reports"
+            output_dir = Path(get_config().output_path) / "reports"
             output_dir.mkdir(parents=True, exist_ok=True)
             
             # 保存JSON格式报告
             json_file = output_dir / f"{report.report_id}.json"
-            with open(json_file, 'w', encoding='utf-8') as f:
-                json.dump(report.dict(), f, ensure_ascii=False, indent=2, default=str)
+            _write_report(report, json_file)
             
             print(f"报告已保存到: {json_file}")
             
@@ -2,6 +2,13 @@
 配置模块
 """
 
-from .settings import config, CorrosionAgentConfig
+from .settings import CorrosionAgentConfig, get_config
 
-__all__ = ["config", "CorrosionAgentConfig"]
\ No newline at end of file
+__all__ = ["config", "CorrosionAgentConfig", "get_config"]
+
+
+def __getattr__(name: str):
+    """按需创建全局配置实例（PEP 562）"""
+    if name == "config":
+        return get_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -4,13 +4,16 @@
 """
 
 import os
-from typing import Optional
+from bisect import bisect_right
+from typing import ClassVar, Optional, Tuple
 from pathlib import Path
-from pydantic import Field
-from pydantic_settings import BaseSettings
+
+import numpy as np
 from dotenv import load_dotenv
+from pydantic import Field, PrivateAttr
+from pydantic_settings import BaseSettings
 
-# 加载环境变量
+# 加载环境变量（dashscope等直接读取环境变量的库也需要 .env 中的取值）
 load_dotenv()
 
 class CorrosionAgentConfig(BaseSettings):
@@ -40,6 +43,11 @@ class CorrosionAgentConfig(BaseSettings):
     # Agent配置
     max_iterations: int = Field(10, env="MAX_ITERATIONS")
     timeout_seconds: int = Field(300, env="TIMEOUT_SECONDS")
+    max_io_concurrency: int = Field(8, env="MAX_IO_CONCURRENCY")  # 逐文件处理的最大并发数
+    persist_processed_images: bool = Field(True, env="PERSIST_PROCESSED_IMAGES")  # 是否将预处理后的图像写入磁盘
+    llm_cache_enabled: bool = Field(True, env="LLM_CACHE_ENABLED")  # 是否缓存相同请求的LLM响应
+    llm_cache_ttl_seconds: int = Field(3600, env="LLM_CACHE_TTL_SECONDS")  # LLM响应缓存的有效期
+    llm_cache_persistent: bool = Field(False, env="LLM_CACHE_PERSISTENT")  # 是否将LLM响应缓存持久化到磁盘（需要diskcache）
     
     # 传感器配置
     sensor_polling_interval: int = Field(60, env="SENSOR_POLLING_INTERVAL")
@@ -50,21 +58,51 @@ class CorrosionAgentConfig(BaseSettings):
     medium_risk_threshold: float = Field(0.6, env="MEDIUM_RISK_THRESHOLD")
     high_risk_threshold: float = Field(0.8, env="HIGH_RISK_THRESHOLD")
     
+    # 风险等级名称，与阈值分段一一对应
+    RISK_LEVELS: ClassVar[Tuple[str, ...]] = ("LOW", "MEDIUM", "HIGH", "CRITICAL")
+    
+    # 目录是否已创建
+    _dirs_ensured: bool = PrivateAttr(False)
+    # 升序风险阈值，加载配置时预先计算
+    _thresholds: tuple = PrivateAttr(())
+    _threshold_array: np.ndarray = PrivateAttr(None)
+    _level_array: np.ndarray = PrivateAttr(None)
+    
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
     
+    def model_post_init(self, __context) -> None:
+        """预先计算风险阈值查找表"""
+        self._thresholds = (self.low_risk_threshold, self.medium_risk_threshold, self.high_risk_threshold)
+        self._threshold_array = np.array(self._thresholds)
+        self._level_array = np.array(self.RISK_LEVELS)
+    
     def ensure_directories(self):
-        """确保必要的目录存在"""
-        directories = [
-            self.data_root_path,
-            self.sample_data_path,
-            self.output_path,
-            os.path.dirname(self.log_file)
-        ]
+        """确保必要的目录存在
+        
+        只创建最小的叶子目录集合（父目录由 parents=True 一并创建），
+        同一配置实例只执行一次。
+        """
+        if self._dirs_ensured:
+            return
         
-        for directory in directories:
-            Path(directory).mkdir(parents=True, exist_ok=True)
+        directories = {
+            Path(directory)
+            for directory in (
+                self.data_root_path,
+                self.sample_data_path,
+                self.output_path,
+                os.path.dirname(self.log_file)
+            )
+            if directory
+        }
+        # 跳过是其他目录祖先的目录
+        leaves = [d for d in directories if not any(d in other.parents for other in directories)]
+        
+        for directory in leaves:
+            directory.mkdir(parents=True, exist_ok=True)
+        self._dirs_ensured = True
     
     def get_model_path(self, model_type: str) -> str:
         """获取模型文件路径"""
@@ -76,18 +114,28 @@ class CorrosionAgentConfig(BaseSettings):
             raise ValueError(f"Unknown model type: {model_type}")
     
     def get_risk_level(self, score: float) -> str:
-        """根据分数确定风险等级"""
-        if score < self.low_risk_threshold:
-            return "LOW"
-        elif score < self.medium_risk_threshold:
-            return "MEDIUM"
-        elif score < self.high_risk_threshold:
-            return "HIGH"
-        else:
-            return "CRITICAL"
+        """根据分数确定风险等级（分数等于阈值时归入更高一级）"""
+        return self.RISK_LEVELS[bisect_right(self._thresholds, score)]
+    
+    def get_risk_levels(self, scores: np.ndarray) -> np.ndarray:
+        """批量确定风险等级，与 get_risk_level 的分段规则一致"""
+        return self._level_array[np.searchsorted(self._threshold_array, scores, side="right")]
+
+# 全局配置实例，首次使用时才创建
+_config: Optional[CorrosionAgentConfig] = None
+
+
+def get_config() -> CorrosionAgentConfig:
+    """获取全局配置实例，首次调用时加载配置并确保目录存在"""
+    global _config
+    if _config is None:
+        _config = CorrosionAgentConfig()
+        _config.ensure_directories()
+    return _config
 
-# 全局配置实例
-config = CorrosionAgentConfig()
 
-# 确保目录存在
-config.ensure_directories()
\ No newline at end of file
+def __getattr__(name: str):
+    """延迟创建模块属性 config（PEP 562），导入本模块不产生解析配置和创建目录的副作用"""
+    if name == "config":
+        return get_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
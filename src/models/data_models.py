@@ -3,9 +3,11 @@
 定义腐蚀检测系统中使用的各种数据结构
 """
 
+import operator
 from datetime import datetime
 from typing import List, Dict, Optional, Any
-from pydantic import BaseModel, Field
+from typing_extensions import Annotated
+from pydantic import BaseModel, Field, PrivateAttr
 from enum import Enum
 import numpy as np
 
@@ -43,6 +45,18 @@ class ImageData(BaseModel):
     location: Dict[str, float]
     resolution: Dict[str, int] = Field(description="图像分辨率 {width, height}")
     metadata: Dict[str, Any] = Field(default_factory=dict)
+    
+    # 数据收集阶段已预处理的像素数组，随状态传递给分析节点，免去重复读盘解码；不参与序列化
+    _pixels: Optional[np.ndarray] = PrivateAttr(default=None)
+    
+    def attach_pixels(self, image: np.ndarray):
+        """附加已预处理的像素数组"""
+        self._pixels = image
+    
+    def take_pixels(self) -> Optional[np.ndarray]:
+        """取出并释放附加的像素数组，未附加时返回None"""
+        image, self._pixels = self._pixels, None
+        return image
 
 class CorrosionDetection(BaseModel):
     """腐蚀检测结果模型"""
@@ -104,12 +118,16 @@ class AgentState(BaseModel):
     inspection_area: str
     
     # 输入数据
+    sensor_files: List[str] = Field(default_factory=list)
     sensor_readings: List[SensorData] = Field(default_factory=list)
+    # 按传感器类型分组的读数值数组（SoA视图），与sensor_readings同步生成，用于向量化统计
+    sensor_arrays: Dict[SensorType, np.ndarray] = Field(default_factory=dict)
     image_files: List[str] = Field(default_factory=list)
     
     # 处理过程数据
     processed_images: List[ImageData] = Field(default_factory=list)
-    corrosion_detections: List[CorrosionDetection] = Field(default_factory=list)
+    # 按图像并行分析的各分支结果通过operator.add归并
+    corrosion_detections: Annotated[List[CorrosionDetection], operator.add] = Field(default_factory=list)
     risk_assessment: Optional[RiskAssessment] = None
     
     # 输出结果
@@ -117,10 +135,13 @@ class AgentState(BaseModel):
     
     # LLM增强分析结果
     llm_analysis: Dict[str, Any] = Field(default_factory=dict)
+    # 风险评估阶段与维护洞察并发预生成的报告摘要，报告生成时直接使用
+    enhanced_summary: Optional[str] = None
     
     # 元数据
     start_time: datetime
     last_update: datetime
+    last_update_ns: int = 0  # 最近一次节点切换的单调时钟读数（time.monotonic_ns）
     errors: List[str] = Field(default_factory=list)
     warnings: List[str] = Field(default_factory=list)
     
@@ -2,8 +2,21 @@
 工具模块
 """
 
-from .image_processor import ImageProcessor
-from .sensor_reader import SensorReader
-from .llm_service import QwenLLMService, llm_service
+from .image_processor import ImageProcessor, shared_image_processor
+from .sensor_reader import SensorReader, shared_sensor_reader
+from .llm_service import QwenLLMService, get_llm_service
 
-__all__ = ["ImageProcessor", "SensorReader", "QwenLLMService", "llm_service"]
\ No newline at end of file
+# 导入子模块时包属性 llm_service 被绑定为模块对象，移除后由 __getattr__ 返回全局服务实例
+del llm_service
+
+__all__ = [
+    "ImageProcessor", "shared_image_processor", "SensorReader", "shared_sensor_reader",
+    "QwenLLMService", "llm_service", "get_llm_service"
+]
+
+
+def __getattr__(name: str):
+    """按需创建全局LLM服务实例（PEP 562）"""
+    if name == "llm_service":
+        return get_llm_service()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,32 @@
+"""
+可选加速依赖兼容模块
+统一处理numba、orjson的可选导入，并提供线程池执行阻塞调用的辅助函数
+"""
+
+import asyncio
+import functools
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """numba未安装时的空装饰器，退化为普通Python函数"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+
+async def run_blocking(func, *args):
+    """在默认线程池中执行阻塞调用（图像读写、LLM请求等），多个调用可并发等待"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args))
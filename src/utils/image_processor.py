@@ -3,16 +3,71 @@
 提供图像预处理、增强和特征提取功能
 """
 
+import threading
+
 import cv2
 import numpy as np
-from typing import Tuple, List
+from typing import List, Optional, Tuple
 from scipy import ndimage
 
+from ._compat import njit
+
+
+@njit(cache=True)
+def _depths_from_integrals(integral, integral_sq, boxes):
+    """由积分图与平方积分图计算每个区域的深度估计值
+    
+    每个区域的和/平方和只需四次查表，得到均值与标准差后套用启发式公式：
+    较暗且变化较大的区域通常表示更深的腐蚀（最大2mm）。
+    """
+    height = integral.shape[0] - 1
+    width = integral.shape[1] - 1
+    depths = np.empty(boxes.shape[0])
+    for i in range(boxes.shape[0]):
+        x0 = boxes[i, 0]
+        y0 = boxes[i, 1]
+        x1 = min(x0 + boxes[i, 2], width)
+        y1 = min(y0 + boxes[i, 3], height)
+        area = (x1 - x0) * (y1 - y0)
+        
+        total = integral[y1, x1] - integral[y0, x1] - integral[y1, x0] + integral[y0, x0]
+        total_sq = integral_sq[y1, x1] - integral_sq[y0, x1] - integral_sq[y1, x0] + integral_sq[y0, x0]
+        mean = total / area
+        std = np.sqrt(max(total_sq / area - mean * mean, 0.0))
+        
+        depth_factor = (255 - mean) / 255.0
+        variation_factor = std / 128.0
+        depths[i] = depth_factor * variation_factor * 2.0
+    return depths
+
+
 class ImageProcessor:
     """图像处理器"""
     
     def __init__(self):
         self.target_size = (640, 480)
+        # 像素到毫米的转换比例（1像素 = 0.1mm），预先换算为单像素面积
+        self.pixel_to_mm_ratio = 0.1
+        self._pixel_area_mm2 = self.pixel_to_mm_ratio ** 2
+        # 锐化卷积核（filter2D 内部按float32计算）
+        self._sharpen_kernel = np.array([[-1, -1, -1],
+                                         [-1,  9, -1],
+                                         [-1, -1, -1]], dtype=np.float32)
+        # 形态学去噪核与铁锈颜色（橙红色）HSV范围
+        self._morph_kernel = np.ones((5, 5), np.uint8)
+        self._rust_lower = np.array([5, 50, 50], dtype=np.uint8)
+        self._rust_upper = np.array([25, 255, 255], dtype=np.uint8)
+        # CLAHE对象可复用，但内部持有工作缓冲区，不能跨线程共享，按线程各建一个
+        self._local = threading.local()
+    
+    @property
+    def _clahe(self):
+        """当前线程的CLAHE（自适应直方图均衡化）对象"""
+        clahe = getattr(self._local, "clahe", None)
+        if clahe is None:
+            clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+            self._local.clahe = clahe
+        return clahe
     
     def preprocess(self, image: np.ndarray) -> np.ndarray:
         """图像预处理"""
@@ -33,7 +88,7 @@ class ImageProcessor:
     def _enhance_contrast(self, image: np.ndarray) -> np.ndarray:
         """增强对比度"""
         # 使用CLAHE（自适应直方图均衡化）
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+        clahe = self._clahe
         
         if len(image.shape) == 3:
             # 彩色图像：转换到LAB空间，只处理L通道
@@ -46,89 +101,74 @@ class ImageProcessor:
     
     def _sharpen_image(self, image: np.ndarray) -> np.ndarray:
         """图像锐化"""
-        kernel = np.array([[-1, -1, -1],
-                          [-1,  9, -1], 
-                          [-1, -1, -1]])
-        
-        if len(image.shape) == 3:
-            # 对每个通道单独处理
-            sharpened = np.zeros_like(image)
-            for i in range(3):
-                sharpened[:, :, i] = cv2.filter2D(image[:, :, i], -1, kernel)
-            return sharpened
-        else:
-            return cv2.filter2D(image, -1, kernel)
+        # filter2D 原生支持多通道，彩色与灰度图像均一次卷积完成
+        return cv2.filter2D(image, -1, self._sharpen_kernel)
     
-    def detect_corrosion_features(self, image: np.ndarray) -> List[Tuple[int, int, int, int]]:
-        """检测腐蚀特征（简化版本）"""
-        # 转换为HSV颜色空间
+    def analyze_image(self, image: np.ndarray) -> Tuple[List[Tuple[int, int, int, int]], float, float]:
+        """一次完成腐蚀检测、面积计算与深度估算，返回 (边界框, 面积, 深度)
+        
+        每种颜色空间只转换一次并在各步骤间复用；未检测到腐蚀时不做灰度转换。
+        """
         hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+        bounding_boxes = self.detect_corrosion_features(image, hsv=hsv)
+        if not bounding_boxes:
+            return bounding_boxes, 0.0, 0.0
         
-        # 定义铁锈颜色范围（橙红色）
-        lower_rust = np.array([5, 50, 50])
-        upper_rust = np.array([25, 255, 255])
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        area = self.calculate_corrosion_area(image, bounding_boxes)
+        depth = self.estimate_corrosion_depth(image, bounding_boxes, gray=gray)
+        return bounding_boxes, area, depth
+    
+    def detect_corrosion_features(self, image: np.ndarray,
+                                  hsv: Optional[np.ndarray] = None) -> List[Tuple[int, int, int, int]]:
+        """检测腐蚀特征（简化版本）；可传入已转换的HSV图像"""
+        # 转换为HSV颜色空间
+        if hsv is None:
+            hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
         
-        # 创建掩码
-        mask = cv2.inRange(hsv, lower_rust, upper_rust)
+        # 按铁锈颜色范围创建掩码
+        mask = cv2.inRange(hsv, self._rust_lower, self._rust_upper)
         
         # 形态学操作去除噪声
-        kernel = np.ones((5, 5), np.uint8)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
-        
-        # 查找轮廓
-        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        
-        # 提取边界框
-        bounding_boxes = []
-        for contour in contours:
-            area = cv2.contourArea(contour)
-            if area > 100:  # 过滤掉太小的区域
-                x, y, w, h = cv2.boundingRect(contour)
-                bounding_boxes.append((x, y, w, h))
-        
-        return bounding_boxes
+        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, self._morph_kernel)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, self._morph_kernel)
+        
+        # 连通域分析：一次调用得到所有区域的边界框与面积
+        _, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+        
+        # 提取边界框（跳过背景标签0），过滤掉太小的区域
+        regions = stats[1:]
+        regions = regions[regions[:, cv2.CC_STAT_AREA] > 100]
+        
+        return [tuple(box) for box in regions[:, :4].tolist()]
     
     def calculate_corrosion_area(self, image: np.ndarray, bounding_boxes: List[Tuple[int, int, int, int]]) -> float:
         """计算腐蚀面积"""
-        total_area = 0
-        for x, y, w, h in bounding_boxes:
-            # 简化计算：使用边界框面积
-            total_area += w * h
+        # 简化计算：使用边界框面积
+        boxes = np.asarray(bounding_boxes, dtype=np.int64).reshape(-1, 4)
+        total_area = int((boxes[:, 2] * boxes[:, 3]).sum())
         
         # 转换为实际面积（假设像素到毫米的转换比例）
-        pixel_to_mm_ratio = 0.1  # 1像素 = 0.1mm
-        actual_area = total_area * (pixel_to_mm_ratio ** 2)
-        
-        return actual_area
+        return total_area * self._pixel_area_mm2
     
-    def estimate_corrosion_depth(self, image: np.ndarray, bounding_boxes: List[Tuple[int, int, int, int]]) -> float:
-        """估算腐蚀深度（基于图像特征）"""
+    def estimate_corrosion_depth(self, image: np.ndarray, bounding_boxes: List[Tuple[int, int, int, int]],
+                                 gray: Optional[np.ndarray] = None) -> float:
+        """估算腐蚀深度（基于图像特征）；可传入已转换的灰度图像"""
         if not bounding_boxes:
             return 0.0
         
         # 转换为灰度图像
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        if gray is None:
+            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
         
-        depth_estimates = []
+        # 一次计算积分图与平方积分图，之后每个区域的和/平方和只需四次查表
+        integral, integral_sq = cv2.integral2(gray, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
         
-        for x, y, w, h in bounding_boxes:
-            # 提取腐蚀区域
-            roi = gray[y:y+h, x:x+w]
-            
-            # 计算强度变化（深度特征）
-            mean_intensity = np.mean(roi)
-            std_intensity = np.std(roi)
-            
-            # 使用启发式方法估算深度
-            # 较暗且变化较大的区域通常表示更深的腐蚀
-            depth_factor = (255 - mean_intensity) / 255.0
-            variation_factor = std_intensity / 128.0
-            
-            estimated_depth = depth_factor * variation_factor * 2.0  # 最大2mm
-            depth_estimates.append(estimated_depth)
+        # 各区域的均值、标准差与深度估计在编译后的内核中逐框计算
+        boxes = np.asarray(bounding_boxes, dtype=np.int64).reshape(-1, 4)
+        depth_estimates = _depths_from_integrals(integral, integral_sq, boxes)
         
-        return max(depth_estimates) if depth_estimates else 0.0
+        return float(depth_estimates.max())
     
     def visualize_detections(self, image: np.ndarray, bounding_boxes: List[Tuple[int, int, int, int]]) -> np.ndarray:
         """可视化检测结果"""
@@ -142,4 +182,8 @@ class ImageProcessor:
             label = f"Corrosion {i+1}"
             cv2.putText(result, label, (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
         
-        return result
\ No newline at end of file
+        return result
+
+
+# 全局共享的图像处理器实例
+shared_image_processor = ImageProcessor()
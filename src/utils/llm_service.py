@@ -4,8 +4,15 @@ LLM服务模块
 用于增强腐蚀检测分析和报告生成
 """
 
+import hashlib
 import json
-from typing import Dict, List, Any, Optional
+import operator
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterator, List, Any, Optional
 from datetime import datetime
 
 try:
@@ -16,14 +23,115 @@ except ImportError:
     DASHSCOPE_AVAILABLE = False
     print("⚠️ dashscope未安装，将使用本地分析模式")
 
-from ..config import config
+try:
+    import diskcache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+
+from ..config import get_config
 from ..models import CorrosionDetection, RiskAssessment, SensorData
+from ._compat import ORJSON_AVAILABLE, orjson, run_blocking
+
+
+# 建议列表行首的编号或列表符号及其后的空白：
+# "1." "1、" "1)" "（1）" "一、" 以及 "-" "•"；编号后紧跟数字的（如 "1.5mm"）是正文而非编号
+_LIST_PREFIX_RE = re.compile(r'^(?:\d+[.．、)）](?!\d)|[（(]\d+[)）]|[一二三四五六七八九十]+[、.．]|[-•])\s*')
+
+# 格式化文本只依赖这些字段，以其取值作为格式化缓存的键
+_SENSOR_FORMAT_FIELDS = operator.attrgetter('sensor_type', 'value', 'unit', 'quality')
+_CORROSION_FORMAT_FIELDS = operator.attrgetter('corrosion_type', 'corrosion_area', 'corrosion_depth', 'confidence')
+
+
+class LLMCallError(Exception):
+    """模型调用返回错误状态"""
 
 
 class QwenLLMService:
     """阿里百炼qwen-plus模型服务"""
     
+    # 内存LRU缓存的最大条目数
+    MEMORY_CACHE_SIZE = 256
+    # 格式化文本缓存的最大条目数，只需覆盖同一次检测中的几次提示词构建
+    FORMAT_CACHE_SIZE = 8
+    
+    # 提示词模板，静态部分只在类定义时创建一次，调用时仅填充动态字段
+    ANALYSIS_PROMPT_TEMPLATE = """作为海上石油平台腐蚀检测专家，请分析以下数据：
+
+传感器数据：
+{sensor_summary}
+
+腐蚀检测结果：
+{corrosion_summary}
+
+请基于以上数据进行专业分析，重点关注：
+1. 腐蚀的严重程度评估
+2. 可能的腐蚀成因分析
+3. 环境因素的影响
+4. 腐蚀发展趋势预测
+
+请以JSON格式返回分析结果，包含以下字段：
+- severity_assessment: 严重程度评估(字符串)
+- root_causes: 可能原因列表
+- environmental_factors: 环境因素影响
+- trend_prediction: 发展趋势预测
+- technical_insights: 技术洞察
+
+确保返回有效的JSON格式。"""
+    
+    SUMMARY_PROMPT_TEMPLATE = """作为海上石油平台检测报告撰写专家，请为以下检测结果生成专业的报告摘要：
+
+平台信息：
+- 平台ID: {platform_id}
+- 检测区域: {inspection_area}
+- 检测时间: {inspection_date}
+
+传感器数据摘要：
+{sensor_summary}
+
+腐蚀检测结果：
+{corrosion_summary}
+
+风险评估：
+- 风险等级: {corrosion_level}
+- 风险评分: {risk_score:.2f}
+- 紧急程度: {urgency}
+
+请生成一份200-300字的专业检测报告摘要，内容应包括：
+1. 检测概况
+2. 主要发现
+3. 风险评估结论
+4. 关键建议
+
+要求：
+- 语言专业、准确
+- 突出重点问题
+- 便于管理层快速理解
+- 符合工业检测报告标准"""
+    
+    MAINTENANCE_PROMPT_TEMPLATE = """作为海上石油平台维护专家，基于以下风险评估结果，提供具体的维护洞察和建议：
+
+风险等级: {corrosion_level}
+风险评分: {risk_score:.2f}
+紧急程度: {urgency}
+当前建议: {recommendations}
+
+请提供3-5条具体的、可操作的维护洞察，每条建议应包含：
+1. 具体的执行步骤
+2. 时间要求
+3. 资源需求
+4. 预期效果
+
+要求：
+- 建议要专业、具体、可执行
+- 考虑海上作业的特殊性
+- 关注安全和成本效益
+- 每条建议控制在50字以内
+
+请直接返回编号的建议列表，不需要其他格式："""
+    
     def __init__(self):
+        config = get_config()
         if DASHSCOPE_AVAILABLE:
             dashscope.api_key = config.dashscope_api_key
             self.model_name = config.qwen_model
@@ -31,6 +139,118 @@ class QwenLLMService:
         else:
             self.available = False
             print("⚠️ LLM服务不可用，将使用传统分析方法")
+        
+        # 以请求内容摘要为键的进程内LRU响应缓存，条目超过有效期后失效；
+        # 开启持久化且安装了diskcache时改为磁盘缓存，可跨进程共享
+        self._cache = None
+        self._cache_ttl = config.llm_cache_ttl_seconds
+        if self.available and config.llm_cache_enabled:
+            if config.llm_cache_persistent and DISKCACHE_AVAILABLE:
+                self._cache = diskcache.Cache(str(Path(config.output_path) / "llm_cache"))
+            else:
+                # 内存缓存条目为 (写入时间, 文本)
+                self._cache = OrderedDict()
+        
+        # 同一批数据在分析、摘要等多个提示词中复用，格式化结果按内容缓存
+        self._fmt_cache: "OrderedDict[tuple, str]" = OrderedDict()
+        # 异步方法在线程池中执行，内存缓存的读写与LRU调整需要加锁
+        self._cache_lock = threading.Lock()
+    
+    def _cached_format(self, kind: str, items: list, formatter, fields) -> str:
+        """按参与格式化的字段取值缓存格式化文本，LRU淘汰
+        
+        键由各元素的字段值构成，元素被原地修改后自然不再命中；缓存不持有列表本身。
+        """
+        if not items:
+            return formatter(items)
+        
+        key = (kind, tuple(map(fields, items)))
+        with self._cache_lock:
+            text = self._fmt_cache.get(key)
+            if text is not None:
+                self._fmt_cache.move_to_end(key)
+                return text
+        
+        text = formatter(items)
+        with self._cache_lock:
+            self._fmt_cache[key] = text
+            if len(self._fmt_cache) > self.FORMAT_CACHE_SIZE:
+                self._fmt_cache.popitem(last=False)
+        return text
+    
+    def _cache_key(self, prompt: str, temperature: float, max_tokens: int) -> str:
+        """对模型、提示词和生成参数的规范化序列化计算blake2b摘要"""
+        payload = json.dumps([self.model_name, prompt, temperature, max_tokens], ensure_ascii=False)
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+    
+    def _generate(self, prompt: str, temperature: float, max_tokens: int):
+        """调用模型生成文本，返回 (文本, 错误信息)"""
+        try:
+            return "".join(self._stream(prompt, temperature, max_tokens)), None
+        except LLMCallError as e:
+            return None, str(e)
+    
+    def _stream(self, prompt: str, temperature: float, max_tokens: int) -> Iterator[str]:
+        """以流式方式调用模型，逐段产出增量文本，返回错误状态时抛出LLMCallError
+        
+        相同请求命中缓存时一次性产出缓存文本，不再发起网络调用；只缓存完整读取的成功响应。
+        """
+        key = None
+        if self._cache is not None:
+            key = self._cache_key(prompt, temperature, max_tokens)
+            cached = self._cache_get(key)
+            if cached is not None:
+                yield cached
+                return
+        
+        responses = Generation.call(
+            model=self.model_name,
+            prompt=prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+            incremental_output=True
+        )
+        chunks = []
+        for response in responses:
+            if response.status_code != 200:
+                raise LLMCallError(response.message)
+            chunk = response.output.text
+            if chunk:
+                chunks.append(chunk)
+                yield chunk
+        
+        if key is not None:
+            self._cache_set(key, "".join(chunks))
+    
+    def _cache_get(self, key: str) -> Optional[str]:
+        """读取未过期的缓存响应"""
+        if not isinstance(self._cache, OrderedDict):
+            # diskcache自行处理过期
+            return self._cache.get(key)
+        
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            stored_at, text = entry
+            if time.monotonic() - stored_at >= self._cache_ttl:
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return text
+    
+    def _cache_set(self, key: str, text: str):
+        """写入缓存响应，内存缓存满时淘汰最久未使用的条目"""
+        if not isinstance(self._cache, OrderedDict):
+            self._cache.set(key, text, expire=self._cache_ttl)
+            return
+        
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic(), text)
+            self._cache.move_to_end(key)
+            if len(self._cache) > self.MEMORY_CACHE_SIZE:
+                self._cache.popitem(last=False)
     
     def analyze_corrosion_data(self, 
                               sensor_data: List[SensorData], 
@@ -43,18 +263,13 @@ class QwenLLMService:
         prompt = self._build_analysis_prompt(sensor_data, corrosion_detections)
         
         try:
-            response = Generation.call(
-                model=self.model_name,
-                prompt=prompt,
-                temperature=0.1,  # 降低温度以获得更稳定的分析结果
-                max_tokens=1500
-            )
+            # 降低温度以获得更稳定的分析结果
+            result, error = self._generate(prompt, temperature=0.1, max_tokens=1500)
             
-            if response.status_code == 200:
-                result = response.output.text
+            if result is not None:
                 return self._parse_analysis_result(result)
             else:
-                print(f"⚠️ LLM调用失败: {response.message}")
+                print(f"⚠️ LLM调用失败: {error}")
                 return self._fallback_analysis(sensor_data, corrosion_detections)
                 
         except Exception as e:
@@ -66,156 +281,139 @@ class QwenLLMService:
                                        corrosion_detections: List[CorrosionDetection],
                                        risk_assessment: RiskAssessment,
                                        platform_id: str,
-                                       inspection_area: str) -> str:
-        """生成增强的报告摘要"""
+                                       inspection_area: str,
+                                       fallback: bool = True) -> Optional[str]:
+        """生成增强的报告摘要
+        
+        fallback为False时，LLM不可用或调用失败返回None而不是回退摘要，
+        便于调用方在评估更新后再用 fallback_summary 生成回退摘要。
+        """
         if not self.available:
-            return self._fallback_summary(sensor_data, corrosion_detections, risk_assessment, platform_id, inspection_area)
+            return self.fallback_summary(sensor_data, corrosion_detections, risk_assessment, platform_id, inspection_area) if fallback else None
         
         prompt = self._build_summary_prompt(sensor_data, corrosion_detections, risk_assessment, platform_id, inspection_area)
         
         try:
-            response = Generation.call(
-                model=self.model_name,
-                prompt=prompt,
-                temperature=0.2,
-                max_tokens=1000
-            )
+            result, error = self._generate(prompt, temperature=0.2, max_tokens=1000)
             
-            if response.status_code == 200:
-                return response.output.text.strip()
+            if result is not None:
+                return result.strip()
             else:
-                print(f"⚠️ 摘要生成失败: {response.message}")
-                return self._fallback_summary(sensor_data, corrosion_detections, risk_assessment, platform_id, inspection_area)
+                print(f"⚠️ 摘要生成失败: {error}")
                 
         except Exception as e:
             print(f"⚠️ 摘要生成异常: {e}")
-            return self._fallback_summary(sensor_data, corrosion_detections, risk_assessment, platform_id, inspection_area)
+        
+        if not fallback:
+            return None
+        return self.fallback_summary(sensor_data, corrosion_detections, risk_assessment, platform_id, inspection_area)
     
     def generate_maintenance_insights(self, risk_assessment: RiskAssessment) -> List[str]:
         """生成深度维护洞察"""
         if not self.available:
             return risk_assessment.recommendations if risk_assessment else []
         
-        prompt = f"""作为海上石油平台维护专家，基于以下风险评估结果，提供具体的维护洞察和建议：
-
-风险等级: {risk_assessment.corrosion_level}
-风险评分: {risk_assessment.risk_score:.2f}
-紧急程度: {risk_assessment.urgency}
-当前建议: {', '.join(risk_assessment.recommendations)}
-
-请提供3-5条具体的、可操作的维护洞察，每条建议应包含：
-1. 具体的执行步骤
-2. 时间要求
-3. 资源需求
-4. 预期效果
-
-要求：
-- 建议要专业、具体、可执行
-- 考虑海上作业的特殊性
-- 关注安全和成本效益
-- 每条建议控制在50字以内
-
-请直接返回编号的建议列表，不需要其他格式："""
-
         try:
-            response = Generation.call(
-                model=self.model_name,
-                prompt=prompt,
-                temperature=0.3,
-                max_tokens=800
-            )
-            
-            if response.status_code == 200:
-                result = response.output.text.strip()
-                # 解析返回的建议列表
-                insights = []
-                lines = result.split('\n')
-                for line in lines:
-                    line = line.strip()
-                    if line and (line[0].isdigit() or line.startswith('-')):
-                        # 清理编号和格式
-                        clean_line = line
-                        for prefix in ['1.', '2.', '3.', '4.', '5.', '-', '•']:
-                            if clean_line.startswith(prefix):
-                                clean_line = clean_line[len(prefix):].strip()
-                                break
-                        insights.append(clean_line)
-                
-                return insights[:5] if insights else risk_assessment.recommendations
-            else:
-                return risk_assessment.recommendations
-                
+            insights = list(self.stream_maintenance_insights(risk_assessment))
+            return insights[:5] if insights else risk_assessment.recommendations
+        except LLMCallError:
+            return risk_assessment.recommendations
         except Exception as e:
             print(f"⚠️ 维护洞察生成异常: {e}")
             return risk_assessment.recommendations
     
+    def stream_maintenance_insights(self, risk_assessment: RiskAssessment) -> Iterator[str]:
+        """流式生成维护洞察，模型每输出完一行有效建议即产出一条
+        
+        调用失败时抛出LLMCallError，由调用方决定回退方式。
+        """
+        prompt = self.MAINTENANCE_PROMPT_TEMPLATE.format(
+            corrosion_level=risk_assessment.corrosion_level,
+            risk_score=risk_assessment.risk_score,
+            urgency=risk_assessment.urgency,
+            recommendations=', '.join(risk_assessment.recommendations)
+        )
+        
+        buffer = ""
+        for chunk in self._stream(prompt, temperature=0.3, max_tokens=800):
+            buffer += chunk
+            # 最后一段可能是未完成的行，留在缓冲区等待后续文本
+            *lines, buffer = buffer.split('\n')
+            for line in lines:
+                insight = self._parse_insight_line(line)
+                if insight:
+                    yield insight
+        
+        insight = self._parse_insight_line(buffer)
+        if insight:
+            yield insight
+    
+    def _parse_insight_line(self, line: str) -> Optional[str]:
+        """解析返回的建议列表中的一行，非编号/列表行返回None"""
+        line = line.strip()
+        if not line:
+            return None
+        
+        # 清理编号和格式
+        match = _LIST_PREFIX_RE.match(line)
+        if match:
+            return line[match.end():] or None
+        # 以数字开头但没有编号符号的行（如 "3天内完成…"）按原样保留
+        return line if line[0].isdigit() else None
+    
+    async def aanalyze_corrosion_data(self,
+                                      sensor_data: List[SensorData],
+                                      corrosion_detections: List[CorrosionDetection]) -> Dict[str, Any]:
+        """analyze_corrosion_data 的异步版本"""
+        return await run_blocking(self.analyze_corrosion_data, sensor_data, corrosion_detections)
+    
+    async def agenerate_enhanced_report_summary(self,
+                                                sensor_data: List[SensorData],
+                                                corrosion_detections: List[CorrosionDetection],
+                                                risk_assessment: RiskAssessment,
+                                                platform_id: str,
+                                                inspection_area: str,
+                                                fallback: bool = True) -> Optional[str]:
+        """generate_enhanced_report_summary 的异步版本"""
+        return await run_blocking(
+            self.generate_enhanced_report_summary,
+            sensor_data, corrosion_detections, risk_assessment, platform_id, inspection_area, fallback
+        )
+    
+    async def agenerate_maintenance_insights(self, risk_assessment: RiskAssessment) -> List[str]:
+        """generate_maintenance_insights 的异步版本"""
+        return await run_blocking(self.generate_maintenance_insights, risk_assessment)
+    
     def _build_analysis_prompt(self, sensor_data: List[SensorData], corrosion_detections: List[CorrosionDetection]) -> str:
         """构建腐蚀分析提示"""
-        sensor_summary = self._format_sensor_data(sensor_data)
-        corrosion_summary = self._format_corrosion_data(corrosion_detections)
+        sensor_summary = self._cached_format("sensor", sensor_data, self._format_sensor_data, _SENSOR_FORMAT_FIELDS)
+        corrosion_summary = self._cached_format(
+            "corrosion", corrosion_detections, self._format_corrosion_data, _CORROSION_FORMAT_FIELDS
+        )
         
-        prompt = f"""作为海上石油平台腐蚀检测专家，请分析以下数据：
-
-传感器数据：
-{sensor_summary}
-
-腐蚀检测结果：
-{corrosion_summary}
-
-请基于以上数据进行专业分析，重点关注：
-1. 腐蚀的严重程度评估
-2. 可能的腐蚀成因分析
-3. 环境因素的影响
-4. 腐蚀发展趋势预测
-
-请以JSON格式返回分析结果，包含以下字段：
-- severity_assessment: 严重程度评估(字符串)
-- root_causes: 可能原因列表
-- environmental_factors: 环境因素影响
-- trend_prediction: 发展趋势预测
-- technical_insights: 技术洞察
-
-确保返回有效的JSON格式。"""
-
-        return prompt
+        return self.ANALYSIS_PROMPT_TEMPLATE.format(
+            sensor_summary=sensor_summary,
+            corrosion_summary=corrosion_summary
+        )
     
     def _build_summary_prompt(self, sensor_data: List[SensorData], corrosion_detections: List[CorrosionDetection],
                              risk_assessment: RiskAssessment, platform_id: str, inspection_area: str) -> str:
         """构建报告摘要提示"""
-        sensor_summary = self._format_sensor_data(sensor_data)
-        corrosion_summary = self._format_corrosion_data(corrosion_detections)
+        sensor_summary = self._cached_format("sensor", sensor_data, self._format_sensor_data, _SENSOR_FORMAT_FIELDS)
+        corrosion_summary = self._cached_format(
+            "corrosion", corrosion_detections, self._format_corrosion_data, _CORROSION_FORMAT_FIELDS
+        )
         
-        prompt = f"""作为海上石油平台检测报告撰写专家，请为以下检测结果生成专业的报告摘要：
-
-平台信息：
-- 平台ID: {platform_id}
-- 检测区域: {inspection_area}
-- 检测时间: {datetime.now().strftime('%Y年%m月%d日')}
-
-传感器数据摘要：
-{sensor_summary}
-
-腐蚀检测结果：
-{corrosion_summary}
-
-风险评估：
-- 风险等级: {risk_assessment.corrosion_level}
-- 风险评分: {risk_assessment.risk_score:.2f}
-- 紧急程度: {risk_assessment.urgency}
-
-请生成一份200-300字的专业检测报告摘要，内容应包括：
-1. 检测概况
-2. 主要发现
-3. 风险评估结论
-4. 关键建议
-
-要求：
-- 语言专业、准确
-- 突出重点问题
-- 便于管理层快速理解
-- 符合工业检测报告标准"""
-
-        return prompt
+        return self.SUMMARY_PROMPT_TEMPLATE.format(
+            platform_id=platform_id,
+            inspection_area=inspection_area,
+            inspection_date=datetime.now().strftime('%Y年%m月%d日'),
+            sensor_summary=sensor_summary,
+            corrosion_summary=corrosion_summary,
+            corrosion_level=risk_assessment.corrosion_level,
+            risk_score=risk_assessment.risk_score,
+            urgency=risk_assessment.urgency
+        )
     
     def _format_sensor_data(self, sensor_data: List[SensorData]) -> str:
         """格式化传感器数据"""
@@ -242,9 +440,14 @@ class QwenLLMService:
     
     def _parse_analysis_result(self, result: str) -> Dict[str, Any]:
         """解析LLM分析结果"""
+        # 模型常在JSON前后附带说明文字或代码块标记，只截取最外层花括号之间的内容
+        start = result.find('{')
+        end = result.rfind('}')
+        payload = result[start:end + 1] if 0 <= start < end else result
+        
         try:
-            # 尝试解析JSON
-            parsed = json.loads(result)
+            # 尝试解析JSON（orjson.JSONDecodeError 是 json.JSONDecodeError 的子类）
+            parsed = orjson.loads(payload) if ORJSON_AVAILABLE else json.loads(payload)
             return parsed
         except json.JSONDecodeError:
             # 如果解析失败，提取文本信息
@@ -266,8 +469,8 @@ class QwenLLMService:
             "technical_insights": "建议使用传统分析方法进行详细评估"
         }
     
-    def _fallback_summary(self, sensor_data: List[SensorData], corrosion_detections: List[CorrosionDetection],
-                         risk_assessment: RiskAssessment, platform_id: str, inspection_area: str) -> str:
+    def fallback_summary(self, sensor_data: List[SensorData], corrosion_detections: List[CorrosionDetection],
+                        risk_assessment: RiskAssessment, platform_id: str, inspection_area: str) -> str:
         """回退摘要生成方法"""
         summary_parts = [
             f"【检测概况】对{platform_id}平台{inspection_area}进行了腐蚀检测，收集了{len(sensor_data)}项传感器数据。",
@@ -278,5 +481,20 @@ class QwenLLMService:
         return "".join(summary_parts)
 
 
-# 全局LLM服务实例
-llm_service = QwenLLMService()
\ No newline at end of file
+# 全局LLM服务实例，首次使用时才创建
+_llm_service: Optional[QwenLLMService] = None
+
+
+def get_llm_service() -> QwenLLMService:
+    """获取全局LLM服务实例"""
+    global _llm_service
+    if _llm_service is None:
+        _llm_service = QwenLLMService()
+    return _llm_service
+
+
+def __getattr__(name: str):
+    """延迟创建模块属性 llm_service（PEP 562）"""
+    if name == "llm_service":
+        return get_llm_service()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
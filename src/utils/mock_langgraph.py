@@ -3,13 +3,38 @@ LangGraph的简化模拟实现
 为了让系统能够独立运行，不依赖外部LangGraph包
 """
 
-from typing import Dict, Any, Callable, Optional, Union
+from typing import Dict, Any, Callable, List, Optional, Union
 import asyncio
+import logging
+
+# 节点执行跟踪走DEBUG级别，默认日志级别下不输出
+logger = logging.getLogger(__name__)
 
 class END:
     """结束标记"""
     pass
 
+class Send:
+    """分支派发指令：以arg为输入单独执行node，多个Send并发执行"""
+    
+    __slots__ = ("node", "arg")
+    
+    def __init__(self, node: str, arg: Any):
+        self.node = node
+        self.arg = arg
+    
+    def __repr__(self) -> str:
+        return f"Send(node={self.node!r})"
+
+def _collect_reducers(state_class) -> Dict[str, Callable]:
+    """从 Annotated[类型, reducer] 字段注解中提取归并函数（如operator.add）"""
+    reducers = {}
+    for name, field_info in getattr(state_class, "model_fields", {}).items():
+        for meta in getattr(field_info, "metadata", ()):
+            if callable(meta):
+                reducers[name] = meta
+    return reducers
+
 class StateGraph:
     """状态图的简化实现"""
     
@@ -38,20 +63,29 @@ class StateGraph:
         """添加条件边"""
         self.conditional_edges[from_node] = (condition_func, mapping)
     
-    def compile(self):
-        """编译图"""
-        return CompiledGraph(self)
+    def compile(self, rebuild_state: bool = False):
+        """编译图
+        
+        Args:
+            rebuild_state: 节点返回字典时是否整体重建状态对象，默认直接在原状态上更新字段
+        """
+        return CompiledGraph(self, rebuild_state=rebuild_state)
 
 class CompiledGraph:
     """编译后的图"""
     
-    def __init__(self, graph: StateGraph):
+    __slots__ = ("graph", "rebuild_state", "reducers")
+    
+    def __init__(self, graph: StateGraph, rebuild_state: bool = False):
         self.graph = graph
+        self.rebuild_state = rebuild_state
+        self.reducers = _collect_reducers(graph.state_class)
     
     def invoke(self, initial_state):
         """同步执行图"""
-        print(f"Mock LangGraph invoke 被调用，初始状态类型: {type(initial_state)}")
+        logger.debug("Mock LangGraph invoke 被调用，初始状态类型: %s", type(initial_state))
         state = initial_state
+        nodes = self.graph.nodes
         current_node = self.graph.entry_point
         
         max_iterations = 20  # 防止无限循环
@@ -61,67 +95,182 @@ class CompiledGraph:
             iteration += 1
             
             # 执行当前节点
-            if current_node in self.graph.nodes:
-                node_func = self.graph.nodes[current_node]
-                print(f"执行节点: {current_node}, 输入类型: {type(state)}")
+            if current_node in nodes:
+                node_func = nodes[current_node]
+                logger.debug("执行节点: %s, 输入类型: %s", current_node, type(state))
                 
                 try:
                     result = node_func(state)
-                    print(f"节点 {current_node} 返回类型: {type(result)}")
-                    
-                    # 确保返回的是正确的状态对象类型
-                    if isinstance(result, self.graph.state_class):
-                        state = result
-                        print(f"OK 节点 {current_node} 正常返回 AgentState 对象")
-                    elif isinstance(result, dict):
-                        # 如果返回字典，尝试转换为状态对象
-                        print(f"WARNING 警告: 节点 {current_node} 返回了字典，尝试重建状态对象")
-                        try:
-                            # 尝试使用字典创建新的状态对象
-                            state = self.graph.state_class(**result)
-                            print(f"OK 成功重建了 AgentState 对象")
-                        except Exception as rebuild_error:
-                            print(f"ERROR 无法重建状态对象: {rebuild_error}")
-                            # 更新现有状态对象的字段
-                            for key, value in result.items():
-                                if hasattr(state, key):
-                                    setattr(state, key, value)
-                            print(f"OK 使用字典更新了现有状态对象")
-                    else:
-                        print(f"ERROR 错误: 节点 {current_node} 返回了不正确的类型: {type(result)}")
-                        # 保持原状态不变
+                    # 异步节点在同步模式下用独立事件循环执行
+                    if asyncio.iscoroutine(result):
+                        result = asyncio.run(result)
+                    state = self._apply_result(current_node, state, result)
                 except Exception as e:
-                    print(f"ERROR 节点执行失败 {current_node}: {e}")
-                    # 确保 state 有 errors 属性
-                    if hasattr(state, 'errors'):
-                        state.errors.append(f"节点 {current_node} 执行失败: {str(e)}")
-                    else:
-                        print(f"WARNING 警告: 状态对象没有 errors 属性")
+                    self._record_failure(current_node, state, e)
             
             # 确定下一个节点
             next_node = self._get_next_node(current_node, state)
+            if isinstance(next_node, list):
+                # Send分支在同步模式下依次执行
+                for send in next_node:
+                    try:
+                        result = nodes[send.node](send.arg)
+                        if asyncio.iscoroutine(result):
+                            result = asyncio.run(result)
+                        self._merge_update(state, result)
+                    except Exception as e:
+                        self._record_failure(send.node, state, e)
+                next_node = self._after_sends(next_node, state)
             current_node = next_node
         
         return state
     
     async def ainvoke(self, initial_state):
-        """异步执行图"""
-        # 简化实现：直接调用同步版本
-        return self.invoke(initial_state)
+        """异步执行图，返回最终状态"""
+        state = initial_state
+        async for state in self.astream(initial_state, stream_mode="values"):
+            pass
+        return state
+    
+    async def astream(self, initial_state, stream_mode: str = "updates"):
+        """异步执行图并逐节点产出事件
+        
+        stream_mode="updates" 时每个事件为 {节点名: 该节点的输出}，
+        stream_mode="values" 时每个事件为节点执行后的完整状态。
+        """
+        state = initial_state
+        nodes = self.graph.nodes
+        current_node = self.graph.entry_point
+        
+        max_iterations = 20  # 防止无限循环
+        iteration = 0
+        
+        while current_node != END and current_node is not None and iteration < max_iterations:
+            iteration += 1
+            
+            if current_node in nodes:
+                node_func = nodes[current_node]
+                logger.debug("执行节点: %s, 输入类型: %s", current_node, type(state))
+                
+                try:
+                    result = node_func(state)
+                    if asyncio.iscoroutine(result):
+                        result = await result
+                    state = self._apply_result(current_node, state, result)
+                except Exception as e:
+                    self._record_failure(current_node, state, e)
+                
+                yield {current_node: state} if stream_mode == "updates" else state
+            
+            next_node = self._get_next_node(current_node, state)
+            if isinstance(next_node, list):
+                updates = await self._arun_sends(next_node, state)
+                if stream_mode == "updates":
+                    for update in updates:
+                        yield update
+                elif updates:
+                    yield state
+                next_node = self._after_sends(next_node, state)
+            current_node = next_node
+    
+    async def _arun_sends(self, sends: List[Send], state) -> List[Dict[str, Any]]:
+        """并发执行全部Send分支，按reducer把各分支的更新归并回状态，返回各分支的更新事件"""
+        async def run_one(send: Send):
+            result = self.graph.nodes[send.node](send.arg)
+            if asyncio.iscoroutine(result):
+                result = await result
+            return result
+        
+        tasks = [asyncio.ensure_future(run_one(send)) for send in sends]
+        try:
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            # 被取消或中断时，取消仍未完成的分支并等待其回收，避免遗留孤儿任务
+            pending = [task for task in tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+        updates = []
+        for send, result in zip(sends, results):
+            if isinstance(result, Exception):
+                self._record_failure(send.node, state, result)
+            else:
+                self._merge_update(state, result)
+                updates.append({send.node: result})
+        return updates
+    
+    def _merge_update(self, state, update: Optional[Dict[str, Any]]):
+        """合并分支返回的部分更新，带reducer的字段做归并，其余字段直接覆盖"""
+        for key, value in (update or {}).items():
+            reducer = self.reducers.get(key)
+            if reducer is not None:
+                setattr(state, key, reducer(getattr(state, key), value))
+            else:
+                setattr(state, key, value)
+    
+    def _after_sends(self, sends: List[Send], state) -> Union[str, None]:
+        """全部分支完成后，沿分支节点的出边继续执行"""
+        if not sends:
+            return None
+        return self._get_next_node(sends[0].node, state)
+    
+    def _apply_result(self, current_node: str, state, result):
+        """将节点返回值合并为新的状态对象"""
+        state_class = self.graph.state_class
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("节点 %s 返回类型: %s", current_node, type(result))
+        
+        # 确保返回的是正确的状态对象类型
+        if isinstance(result, state_class):
+            if debug:
+                logger.debug("节点 %s 正常返回 AgentState 对象", current_node)
+            return result
+        elif isinstance(result, dict):
+            if self.rebuild_state or not isinstance(state, state_class):
+                # 显式要求重建，或当前状态已不是状态类实例时，用字典构造新的状态对象；字典来自图内节点，跳过pydantic校验
+                if debug:
+                    logger.debug("节点 %s 返回了字典，重建状态对象", current_node)
+                construct = getattr(state_class, "model_construct", state_class)
+                state = construct(**result)
+            else:
+                # 节点通常只改动少数字段，直接在现有状态对象上更新，避免整棵状态树重建
+                for key, value in result.items():
+                    if hasattr(state, key):
+                        setattr(state, key, value)
+        else:
+            logger.warning("节点 %s 返回了不正确的类型: %s", current_node, type(result))
+            # 保持原状态不变
+        return state
+    
+    def _record_failure(self, current_node: str, state, error: Exception):
+        """记录节点执行失败"""
+        logger.error("节点执行失败 %s: %s", current_node, error)
+        # 确保 state 有 errors 属性
+        if hasattr(state, 'errors'):
+            state.errors.append(f"节点 {current_node} 执行失败: {str(error)}")
+        else:
+            logger.warning("状态对象没有 errors 属性")
     
-    def _get_next_node(self, current_node: str, state) -> Union[str, None]:
-        """获取下一个节点"""
+    def _get_next_node(self, current_node: str, state) -> Union[str, List[Send], None]:
+        """获取下一个节点，条件边返回Send列表时原样交给调用方派发"""
+        graph = self.graph
         # 检查条件边
-        if current_node in self.graph.conditional_edges:
-            condition_func, mapping = self.graph.conditional_edges[current_node]
+        if current_node in graph.conditional_edges:
+            condition_func, mapping = graph.conditional_edges[current_node]
             condition_result = condition_func(state)
+            if isinstance(condition_result, Send):
+                condition_result = [condition_result]
+            if isinstance(condition_result, list):
+                return condition_result
             if condition_result in mapping:
                 next_node = mapping[condition_result]
                 return next_node if next_node != END else None
         
         # 检查普通边
-        if current_node in self.graph.edges:
-            edges = self.graph.edges[current_node]
+        if current_node in graph.edges:
+            edges = graph.edges[current_node]
             if edges:
                 next_node = edges[0]  # 取第一个边
                 return next_node if next_node != END else None
@@ -3,20 +3,202 @@
 处理各种传感器数据的读取和解析
 """
 
+import asyncio
 import json
 import csv
+import itertools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
-from datetime import datetime
-from typing import List, Dict, Any
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Iterable, Tuple, Union
 from pathlib import Path
 
+try:
+    import ciso8601
+    CISO8601_AVAILABLE = True
+except ImportError:
+    CISO8601_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    import h5py
+    H5PY_AVAILABLE = True
+except ImportError:
+    H5PY_AVAILABLE = False
+
+from ..config import get_config
 from ..models import SensorData, SensorType
+from ._compat import ORJSON_AVAILABLE, orjson
+
+# 解析失败等告警走日志；默认挂NullHandler不输出，由应用按需配置处理器
+logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+# 传感器类型字符串到枚举的查找表
+_TYPE_MAP = {t.value: t for t in SensorType}
+# 传感器类型到紧凑整数编码（SensorBatch.types）
+_TYPE_CODES = {t: i for i, t in enumerate(SensorType)}
+
+# 各传感器类型读数值的有效范围，未列出的类型不做范围检查
+_VALUE_RANGES = {
+    SensorType.THICKNESS: (0.0, 50.0),      # 厚度范围0-50mm
+    SensorType.TEMPERATURE: (-50.0, 100.0),  # 温度范围-50到100°C
+    SensorType.HUMIDITY: (0.0, 100.0),      # 湿度0-100%
+    SensorType.PH: (0.0, 14.0)              # pH 0-14
+}
+_NO_RANGE = (-np.inf, np.inf)
+# 按类型编码索引的上下限表，供批量校验使用
+_RANGE_LOW = np.array([_VALUE_RANGES.get(t, _NO_RANGE)[0] for t in SensorType])
+_RANGE_HIGH = np.array([_VALUE_RANGES.get(t, _NO_RANGE)[1] for t in SensorType])
+
+
+def _parse_timestamp(value: Any, now: datetime) -> datetime:
+    """解析ISO格式时间戳，非字符串（缺失值等）时取当前时间
+    
+    安装ciso8601时用其C实现解析（原生支持末尾的Z），否则回退到datetime.fromisoformat。
+    已解析的datetime原样返回。
+    """
+    if isinstance(value, datetime):
+        return value
+    if not isinstance(value, str):
+        return now
+    if CISO8601_AVAILABLE:
+        return ciso8601.parse_datetime(value)
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+# pyarrow CSV解析的读取块大小（字节）
+_CSV_BLOCK_SIZE = 8 << 20
+
+
+def _load_csv(file_path: Path) -> pd.DataFrame:
+    """加载CSV为DataFrame
+    
+    安装pyarrow时使用其多线程列式解析器，并以较大的读取块减少大文件的分块开销；
+    文本列固定按字符串读取，避免时间戳等被自动推断为其他类型，空单元格与pandas一致视为缺失值。
+    数值列不固定类型，由 _numeric_column 逐值转换，个别非法单元格只影响所在行。
+    """
+    if not PYARROW_AVAILABLE:
+        return pd.read_csv(file_path)
+    
+    convert_options = pacsv.ConvertOptions(
+        column_types={
+            'sensor_id': pa.string(),
+            'sensor_type': pa.string(),
+            'unit': pa.string(),
+            'timestamp': pa.string()
+        },
+        strings_can_be_null=True
+    )
+    read_options = pacsv.ReadOptions(block_size=_CSV_BLOCK_SIZE)
+    return pacsv.read_csv(
+        str(file_path), read_options=read_options, convert_options=convert_options
+    ).to_pandas()
+
+
+def _column(df: pd.DataFrame, name: str, default: Any, fill_missing: bool = False) -> Iterable:
+    """取出DataFrame的一列为Python原生值列表，缺少该列时返回默认值序列
+    
+    fill_missing为True时该列中的空值也以默认值填充。
+    """
+    if name not in df.columns:
+        return itertools.repeat(default, len(df))
+    column = df[name]
+    if fill_missing:
+        column = column.fillna(default)
+    return column.tolist()
+
+
+def _numeric_column(df: pd.DataFrame, name: str, default: float) -> Iterable:
+    """取出数值列为float列表，无法转换为数值的单元格置为None，缺少该列时返回默认值序列
+    
+    空单元格保持为NaN，与逐行 float() 转换的结果一致。
+    """
+    if name not in df.columns:
+        return itertools.repeat(default, len(df))
+    column = df[name]
+    if pd.api.types.is_numeric_dtype(column):
+        return column.astype('float64').tolist()
+    numeric = pd.to_numeric(column, errors='coerce')
+    invalid = numeric.isna() & column.notna()
+    return numeric.astype('object').mask(invalid, None).tolist()
+
+
+def _to_datetime64(timestamp: datetime) -> np.datetime64:
+    """转换为微秒精度的datetime64，带时区的时间先换算为UTC"""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return np.datetime64(timestamp, 'us')
+
+
+class SensorBatch:
+    """传感器读数批次（SoA布局）
+    
+    除读数对象本身外，按列保存读数值、质量评分、时间戳和类型编码的连续数组，
+    过滤时直接在数组上做向量化掩码运算，不再逐个访问对象属性。
+    """
+    
+    __slots__ = ("readings", "values", "qualities", "timestamps", "types")
+    
+    def __init__(self, readings: np.ndarray, values: np.ndarray, qualities: np.ndarray,
+                 timestamps: np.ndarray, types: np.ndarray):
+        self.readings = readings
+        self.values = values
+        self.qualities = qualities
+        self.timestamps = timestamps
+        self.types = types
+    
+    @classmethod
+    def from_readings(cls, readings: List[SensorData]) -> "SensorBatch":
+        """由读数列表构建批次"""
+        n = len(readings)
+        return cls(
+            np.fromiter(readings, dtype=object, count=n),
+            np.fromiter((r.value for r in readings), dtype=np.float64, count=n),
+            np.fromiter((r.quality for r in readings), dtype=np.float64, count=n),
+            np.fromiter((_to_datetime64(r.timestamp) for r in readings), dtype='datetime64[us]', count=n),
+            np.fromiter((_TYPE_CODES[r.sensor_type] for r in readings), dtype=np.int8, count=n)
+        )
+    
+    def __len__(self) -> int:
+        return len(self.readings)
+    
+    def __getitem__(self, index) -> "SensorBatch":
+        """按布尔掩码或索引数组取子批次"""
+        return SensorBatch(
+            self.readings[index], self.values[index], self.qualities[index],
+            self.timestamps[index], self.types[index]
+        )
+    
+    def to_list(self) -> List[SensorData]:
+        """转换回读数列表"""
+        return self.readings.tolist()
+
+
+# 文件扩展名到读取方法名的分派表
+_READER_METHODS = {
+    '.json': '_read_json_file',
+    '.csv': '_read_csv_file',
+    '.txt': '_read_txt_file'
+}
+if H5PY_AVAILABLE:
+    _READER_METHODS['.h5'] = '_read_hdf5_file'
+    _READER_METHODS['.hdf5'] = '_read_hdf5_file'
+
 
 class SensorReader:
     """传感器数据读取器"""
     
-    def __init__(self):
-        self.supported_formats = ['.json', '.csv', '.txt']
+    # 支持的文件格式（模块级常量，所有实例共享）
+    supported_formats = list(_READER_METHODS)
     
     def read_sensor_file(self, file_path: str) -> List[SensorData]:
         """读取传感器数据文件"""
@@ -27,27 +209,128 @@ class SensorReader:
         
         file_extension = file_path.suffix.lower()
         
-        if file_extension == '.json':
-            return self._read_json_file(file_path)
-        elif file_extension == '.csv':
-            return self._read_csv_file(file_path)
-        elif file_extension == '.txt':
-            return self._read_txt_file(file_path)
-        else:
+        method_name = _READER_METHODS.get(file_extension)
+        if method_name is None:
             raise ValueError(f"不支持的文件格式: {file_extension}")
+        return getattr(self, method_name)(file_path)
+    
+    async def read_sensor_files(
+        self, file_paths: List[str]
+    ) -> Tuple[List[SensorData], List[Tuple[str, Exception]]]:
+        """并发读取多个传感器数据文件，返回 (按输入顺序合并的读数, [(读取失败的路径, 异常)])
+        
+        各文件的读取与解析在线程池中并发进行（最大并发数为max_io_concurrency），
+        全部提交后统一等待完成。
+        """
+        if not file_paths:
+            return [], []
+        
+        loop = asyncio.get_running_loop()
+        workers = min(len(file_paths), get_config().max_io_concurrency)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = await asyncio.gather(
+                *(loop.run_in_executor(executor, self.read_sensor_file, path) for path in file_paths),
+                return_exceptions=True
+            )
+        
+        sensor_readings = []
+        errors = []
+        for path, result in zip(file_paths, results):
+            if isinstance(result, Exception):
+                errors.append((path, result))
+            else:
+                sensor_readings.extend(result)
+        return sensor_readings, errors
+    
+    def read_sensor_batch(self, file_path: str) -> SensorBatch:
+        """读取传感器数据文件为SoA批次，供批量过滤使用"""
+        return SensorBatch.from_readings(self.read_sensor_file(file_path))
+    
+    def convert_to_hdf5(self, src_path: str, dst_path: str) -> int:
+        """将传感器数据文件一次性转换为HDF5列式存储，返回写入的读数条数
+        
+        各列分别存为数据集：sensor_id/unit（UTF-8字符串）、value/quality（f8）、
+        timestamp（自1970年起的微秒数，带时区的时间换算为UTC）、sensor_type（i1类型编码）、
+        xyz（N×3坐标）；类型编码对应的名称保存在文件属性 sensor_types 中。
+        之后读取该文件不再需要逐值解析字符串。
+        """
+        if not H5PY_AVAILABLE:
+            raise ImportError("h5py未安装，无法转换为HDF5格式")
+        
+        readings = self.read_sensor_file(src_path)
+        batch = SensorBatch.from_readings(readings)
+        str_dtype = h5py.string_dtype('utf-8')
+        xyz = np.array(
+            [[r.location.get('x', 0.0), r.location.get('y', 0.0), r.location.get('z', 0.0)] for r in readings],
+            dtype=np.float64
+        ).reshape(-1, 3)
+        
+        with h5py.File(dst_path, 'w') as f:
+            f.attrs['sensor_types'] = [t.value for t in SensorType]
+            f.create_dataset('sensor_id', data=np.array([r.sensor_id for r in readings], dtype=object), dtype=str_dtype)
+            f.create_dataset('unit', data=np.array([r.unit for r in readings], dtype=object), dtype=str_dtype)
+            f.create_dataset('sensor_type', data=batch.types)
+            f.create_dataset('value', data=batch.values)
+            f.create_dataset('quality', data=batch.qualities)
+            f.create_dataset('timestamp', data=batch.timestamps.astype(np.int64))
+            f.create_dataset('xyz', data=xyz)
+        
+        return len(readings)
+    
+    def _read_hdf5_file(self, file_path: Path) -> List[SensorData]:
+        """读取由 convert_to_hdf5 生成的HDF5列式传感器数据"""
+        with h5py.File(file_path, 'r') as f:
+            type_table = [_TYPE_MAP.get(name, SensorType.THICKNESS) for name in f.attrs['sensor_types']]
+            columns = zip(
+                f['sensor_id'].asstr()[()].tolist(),
+                f['sensor_type'][()].tolist(),
+                f['value'][()].tolist(),
+                f['unit'].asstr()[()].tolist(),
+                f['timestamp'][()].astype('datetime64[us]').tolist(),
+                f['xyz'][()].tolist(),
+                f['quality'][()].tolist()
+            )
+            
+            sensor_readings = []
+            append = sensor_readings.append
+            for sensor_id, type_code, value, unit, timestamp, (x, y, z), quality in columns:
+                try:
+                    append(SensorData(
+                        sensor_id=sensor_id,
+                        sensor_type=type_table[type_code],
+                        value=value,
+                        unit=unit,
+                        timestamp=timestamp,
+                        location={"x": x, "y": y, "z": z},
+                        quality=quality
+                    ))
+                except ValueError as e:
+                    logger.warning("解析传感器数据失败: %s", e)
+        
+        return sensor_readings
     
     def _read_json_file(self, file_path: Path) -> List[SensorData]:
         """读取JSON格式的传感器数据"""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        if ORJSON_AVAILABLE:
+            # orjson直接解析字节内容，省去文本解码
+            data = orjson.loads(file_path.read_bytes())
+        else:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
         
         sensor_readings = []
         
         if isinstance(data, list):
+            now = datetime.now()
+            append = sensor_readings.append
             for item in data:
-                sensor_data = self._parse_sensor_item(item)
+                try:
+                    sensor_data = self._parse_complete_item(item, now)
+                except Exception:
+                    # 字段不全或取值异常的记录走通用解析（补默认值并记录失败原因）
+                    sensor_data = self._parse_sensor_item(item)
                 if sensor_data:
-                    sensor_readings.append(sensor_data)
+                    append(sensor_data)
         elif isinstance(data, dict):
             sensor_data = self._parse_sensor_item(data)
             if sensor_data:
@@ -56,47 +339,92 @@ class SensorReader:
         return sensor_readings
     
     def _read_csv_file(self, file_path: Path) -> List[SensorData]:
-        """读取CSV格式的传感器数据"""
-        df = pd.read_csv(file_path)
-        sensor_readings = []
+        """读取CSV格式的传感器数据
         
-        for _, row in df.iterrows():
-            sensor_data = self._parse_sensor_row(row.to_dict())
-            if sensor_data:
-                sensor_readings.append(sensor_data)
+        按列整体完成类型转换后逐行构建模型，不为每行创建Series；
+        可选的 x/y/z 列作为坐标位置。
+        """
+        df = _load_csv(file_path)
+        now = datetime.now()
+        
+        if 'sensor_type' in df.columns:
+            sensor_types = df['sensor_type'].astype(str).str.lower().tolist()
+        else:
+            sensor_types = itertools.repeat('thickness', len(df))
+        if 'sensor_id' in df.columns:
+            sensor_ids = df['sensor_id'].astype(str).tolist()
+        else:
+            sensor_ids = itertools.repeat(f'sensor_{now.timestamp()}', len(df))
+        units = _column(df, 'unit', '', True)
+        timestamps = _column(df, 'timestamp', None)
+        if 'timestamp' in df.columns and pd.api.types.is_string_dtype(df['timestamp']):
+            try:
+                # 整列一次性解析；时区不一致或含非法值时抛出异常，回退到逐行解析
+                parsed = pd.to_datetime(df['timestamp'], format='ISO8601', cache=True)
+                timestamps = [now if ts is pd.NaT else ts for ts in parsed.dt.to_pydatetime()]
+            except (ValueError, TypeError):
+                pass
+        
+        columns = zip(
+            sensor_ids, sensor_types, _numeric_column(df, 'value', 0.0), units,
+            timestamps,
+            _column(df, 'x', 0.0, True), _column(df, 'y', 0.0, True), _column(df, 'z', 0.0, True),
+            _numeric_column(df, 'quality', 1.0)
+        )
+        
+        sensor_readings = []
+        append = sensor_readings.append
+        for sensor_id, sensor_type, value, unit, timestamp, x, y, z, quality in columns:
+            if value is None or quality is None:
+                # 非数值单元格只跳过所在行
+                logger.warning("解析传感器数据失败: 传感器 %s 的数值或质量评分无效", sensor_id)
+                continue
+            try:
+                append(SensorData(
+                    sensor_id=sensor_id,
+                    sensor_type=_TYPE_MAP.get(sensor_type, SensorType.THICKNESS),
+                    value=value,
+                    unit=unit,
+                    timestamp=_parse_timestamp(timestamp, now),
+                    location={"x": x, "y": y, "z": z},
+                    quality=quality
+                ))
+            except ValueError as e:
+                logger.warning("解析传感器数据失败: %s", e)
         
         return sensor_readings
     
     def _read_txt_file(self, file_path: Path) -> List[SensorData]:
-        """读取文本格式的传感器数据"""
+        """读取文本格式的传感器数据（一次读入并整体解码后按行切分）"""
         sensor_readings = []
+        # 循环内用到的方法提前绑定到局部变量
+        append = sensor_readings.append
+        parse_line = self._parse_sensor_line
         
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith('#'):  # 跳过空行和注释
-                    sensor_data = self._parse_sensor_line(line)
-                    if sensor_data:
-                        sensor_readings.append(sensor_data)
+        for line in file_path.read_bytes().decode('utf-8').splitlines():
+            line = line.strip()
+            if line and not line.startswith('#'):  # 跳过空行和注释
+                sensor_data = parse_line(line)
+                if sensor_data:
+                    append(sensor_data)
         
         return sensor_readings
     
     def _parse_sensor_item(self, item: Dict[str, Any]) -> SensorData:
         """解析单个传感器数据项"""
         try:
+            # 默认时间戳与默认传感器ID共用同一个当前时间
+            now = datetime.now()
+            
             # 处理时间戳
-            timestamp_str = item.get('timestamp', datetime.now().isoformat())
-            if isinstance(timestamp_str, str):
-                timestamp = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-            else:
-                timestamp = datetime.now()
+            timestamp = _parse_timestamp(item.get('timestamp'), now)
+            
+            # 处理传感器ID（仅在缺失时生成默认值）
+            sensor_id = item['sensor_id'] if 'sensor_id' in item else f'sensor_{now.timestamp()}'
             
             # 处理传感器类型
             sensor_type_str = item.get('sensor_type', 'thickness').lower()
-            try:
-                sensor_type = SensorType(sensor_type_str)
-            except ValueError:
-                sensor_type = SensorType.THICKNESS  # 默认类型
+            sensor_type = _TYPE_MAP.get(sensor_type_str, SensorType.THICKNESS)  # 未知类型按默认类型处理
             
             # 处理位置信息
             location = item.get('location', {"x": 0, "y": 0, "z": 0})
@@ -104,7 +432,7 @@ class SensorReader:
                 location = {"x": 0, "y": 0, "z": 0}
             
             sensor_data = SensorData(
-                sensor_id=item.get('sensor_id', f'sensor_{datetime.now().timestamp()}'),
+                sensor_id=sensor_id,
                 sensor_type=sensor_type,
                 value=float(item.get('value', 0.0)),
                 unit=item.get('unit', ''),
@@ -116,12 +444,24 @@ class SensorReader:
             return sensor_data
             
         except Exception as e:
-            print(f"解析传感器数据失败: {e}")
+            logger.warning("解析传感器数据失败: %s", e)
             return None
     
-    def _parse_sensor_row(self, row: Dict[str, Any]) -> SensorData:
-        """解析CSV行数据"""
-        return self._parse_sensor_item(row)
+    def _parse_complete_item(self, item: Dict[str, Any], now: datetime) -> SensorData:
+        """字段齐全记录的快速解析
+        
+        生产数据通常每条记录都带全部字段，直接按键取值，省去 _parse_sensor_item 中
+        逐字段的 get 与默认值构造；缺少字段或校验失败时抛出异常，由调用方回退到通用解析。
+        """
+        return SensorData(
+            sensor_id=item['sensor_id'],
+            sensor_type=_TYPE_MAP.get(item['sensor_type'].lower(), SensorType.THICKNESS),
+            value=float(item['value']),
+            unit=item['unit'],
+            timestamp=_parse_timestamp(item['timestamp'], now),
+            location=item['location'],
+            quality=float(item['quality'])
+        )
     
     def _parse_sensor_line(self, line: str) -> SensorData:
         """解析文本行数据"""
@@ -132,41 +472,32 @@ class SensorReader:
             return None
         
         try:
-            item = {
-                'sensor_id': parts[0].strip(),
-                'sensor_type': parts[1].strip(),
-                'value': parts[2].strip(),
-                'unit': parts[3].strip(),
-                'timestamp': parts[4].strip(),
-                'location': {
-                    'x': float(parts[5]) if len(parts) > 5 else 0.0,
-                    'y': float(parts[6]) if len(parts) > 6 else 0.0,
-                    'z': float(parts[7]) if len(parts) > 7 else 0.0
+            n = len(parts)
+            # 直接由各字段构建模型，不经过中间字典
+            return SensorData(
+                sensor_id=parts[0].strip(),
+                sensor_type=_TYPE_MAP.get(parts[1].strip().lower(), SensorType.THICKNESS),
+                value=float(parts[2]),
+                unit=parts[3].strip(),
+                timestamp=_parse_timestamp(parts[4].strip(), None),
+                location={
+                    'x': float(parts[5]) if n > 5 else 0.0,
+                    'y': float(parts[6]) if n > 6 else 0.0,
+                    'z': float(parts[7]) if n > 7 else 0.0
                 },
-                'quality': float(parts[8]) if len(parts) > 8 else 1.0
-            }
-            
-            return self._parse_sensor_item(item)
+                quality=float(parts[8]) if n > 8 else 1.0
+            )
             
         except Exception as e:
-            print(f"解析文本行失败: {e}")
+            logger.warning("解析文本行失败: %s", e)
             return None
     
     def validate_sensor_data(self, sensor_data: SensorData) -> bool:
         """验证传感器数据有效性"""
         # 检查数值范围
-        if sensor_data.sensor_type == SensorType.THICKNESS:
-            if sensor_data.value < 0 or sensor_data.value > 50:  # 厚度范围0-50mm
-                return False
-        elif sensor_data.sensor_type == SensorType.TEMPERATURE:
-            if sensor_data.value < -50 or sensor_data.value > 100:  # 温度范围-50到100°C
-                return False
-        elif sensor_data.sensor_type == SensorType.HUMIDITY:
-            if sensor_data.value < 0 or sensor_data.value > 100:  # 湿度0-100%
-                return False
-        elif sensor_data.sensor_type == SensorType.PH:
-            if sensor_data.value < 0 or sensor_data.value > 14:  # pH 0-14
-                return False
+        low, high = _VALUE_RANGES.get(sensor_data.sensor_type, _NO_RANGE)
+        if sensor_data.value < low or sensor_data.value > high:
+            return False
         
         # 检查质量评分
         if sensor_data.quality < 0 or sensor_data.quality > 1:
@@ -174,17 +505,41 @@ class SensorReader:
         
         return True
     
-    def filter_by_quality(self, sensor_readings: List[SensorData], min_quality: float = 0.7) -> List[SensorData]:
-        """根据质量过滤传感器数据"""
+    def validate_sensor_batch(self, batch: SensorBatch) -> np.ndarray:
+        """批量验证传感器数据有效性，返回与批次等长的布尔掩码
+        
+        规则与 validate_sensor_data 一致，按类型编码查上下限表后一次性比较整个批次。
+        """
+        values = batch.values
+        qualities = batch.qualities
+        out_of_range = (values < _RANGE_LOW[batch.types]) | (values > _RANGE_HIGH[batch.types])
+        bad_quality = (qualities < 0) | (qualities > 1)
+        return ~(out_of_range | bad_quality)
+    
+    def filter_by_quality(self, sensor_readings: Union[List[SensorData], SensorBatch],
+                          min_quality: float = 0.7) -> Union[List[SensorData], SensorBatch]:
+        """根据质量过滤传感器数据（传入SensorBatch时返回过滤后的批次）"""
+        if isinstance(sensor_readings, SensorBatch):
+            return sensor_readings[sensor_readings.qualities >= min_quality]
         return [reading for reading in sensor_readings if reading.quality >= min_quality]
     
-    def filter_by_time_range(self, sensor_readings: List[SensorData], 
-                           start_time: datetime, end_time: datetime) -> List[SensorData]:
-        """根据时间范围过滤传感器数据"""
+    def filter_by_time_range(self, sensor_readings: Union[List[SensorData], SensorBatch], 
+                           start_time: datetime, end_time: datetime) -> Union[List[SensorData], SensorBatch]:
+        """根据时间范围过滤传感器数据（传入SensorBatch时返回过滤后的批次）"""
+        if isinstance(sensor_readings, SensorBatch):
+            timestamps = sensor_readings.timestamps
+            mask = (timestamps >= _to_datetime64(start_time)) & (timestamps <= _to_datetime64(end_time))
+            return sensor_readings[mask]
         return [reading for reading in sensor_readings 
                 if start_time <= reading.timestamp <= end_time]
     
-    def get_readings_by_type(self, sensor_readings: List[SensorData], 
-                           sensor_type: SensorType) -> List[SensorData]:
-        """按传感器类型过滤数据"""
-        return [reading for reading in sensor_readings if reading.sensor_type == sensor_type]
\ No newline at end of file
+    def get_readings_by_type(self, sensor_readings: Union[List[SensorData], SensorBatch], 
+                           sensor_type: SensorType) -> Union[List[SensorData], SensorBatch]:
+        """按传感器类型过滤数据（传入SensorBatch时返回过滤后的批次）"""
+        if isinstance(sensor_readings, SensorBatch):
+            return sensor_readings[sensor_readings.types == _TYPE_CODES[sensor_type]]
+        return [reading for reading in sensor_readings if reading.sensor_type == sensor_type]
+
+
+# 全局共享的传感器读取器实例
+shared_sensor_reader = SensorReader()
@@ -4,18 +4,28 @@
 
 import pytest
 import asyncio
-from datetime import datetime
+import json
+import operator
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import List
 import sys
 
+import numpy as np
+from pydantic import BaseModel, Field
+from typing_extensions import Annotated
+
 # 添加src目录到Python路径
 sys.path.append(str(Path(__file__).parent.parent))
 
 from src.agents.corrosion_agent import CorrosionDetectionAgent
 from src.agents.nodes import DataCollectionNode, CorrosionAnalysisNode, RiskAssessmentNode
-from src.models import AgentState, SensorData, SensorType, CorrosionLevel
+from src.models import AgentState, SensorData, SensorType, CorrosionLevel, CorrosionDetection
 from src.utils.image_processor import ImageProcessor
+from src.utils.sensor_reader import SensorReader, SensorBatch
+from src.utils.llm_service import QwenLLMService, _LIST_PREFIX_RE
 from src.config import config
+from src.utils.mock_langgraph import StateGraph, Send, END, _collect_reducers
 
 
 class TestCorrosionDetectionAgent:
@@ -28,7 +38,7 @@ class TestCorrosionDetectionAgent:
         assert hasattr(agent, 'graph')
         assert hasattr(agent, 'nodes')
     
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="session")
     async def test_basic_inspection_flow(self):
         """测试基础检测流程"""
         agent = CorrosionDetectionAgent()
@@ -47,10 +57,10 @@ class TestCorrosionDetectionAgent:
         """测试同步检测流程"""
         agent = CorrosionDetectionAgent()
         
-        result = agent.run_inspection_sync(
+        result = asyncio.run(agent.run_inspection(
             platform_id="TEST_PLATFORM_SYNC",
             inspection_area="同步测试区域"
-        )
+        ))
         
         assert result is not None
         assert result.platform_id == "TEST_PLATFORM_SYNC"
@@ -88,6 +98,65 @@ class TestDataCollectionNode:
         assert len(result_state.sensor_readings) > 0
         assert len(result_state.processed_images) > 0
     
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_async_data_collection_execution(self):
+        """测试异步数据收集执行"""
+        node = DataCollectionNode()
+        
+        state = AgentState(
+            session_id="test_session",
+            current_step="test",
+            platform_id="TEST_PLATFORM",
+            inspection_area="测试区域",
+            image_files=["missing_image.jpg"],
+            start_time=datetime.now(),
+            last_update=datetime.now()
+        )
+        
+        result_state = await node.aexecute(state)
+        
+        assert len(result_state.sensor_readings) > 0
+        assert len(result_state.processed_images) > 0
+        assert any("missing_image.jpg" in w for w in result_state.warnings)
+    
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_async_data_collection_from_sensor_files(self, tmp_path):
+        """测试并发读取传感器文件，读数按文件顺序合并，缺失或无法读取的文件记录警告"""
+        csv_file = tmp_path / "sensors.csv"
+        csv_file.write_text(
+            "sensor_id,sensor_type,value,unit,timestamp,quality\n"
+            "csv_001,temperature,26.5,°C,2024-01-15T10:30:00,0.9\n",
+            encoding="utf-8"
+        )
+        corrupt_file = tmp_path / "corrupt.json"
+        corrupt_file.write_text('[{"sensor_id": "broken"', encoding="utf-8")
+        unsupported_file = tmp_path / "sensors.xml"
+        unsupported_file.write_text("<sensors/>", encoding="utf-8")
+        json_file = Path(__file__).parent.parent / "data" / "sample" / "sensor_data.json"
+        node = DataCollectionNode()
+        
+        state = AgentState(
+            session_id="test_session",
+            current_step="test",
+            platform_id="TEST_PLATFORM",
+            inspection_area="测试区域",
+            sensor_files=[str(json_file), "missing_sensors.json", str(corrupt_file),
+                          str(unsupported_file), str(csv_file)],
+            start_time=datetime.now(),
+            last_update=datetime.now()
+        )
+        
+        result_state = await node.aexecute(state)
+        
+        sensor_ids = [reading.sensor_id for reading in result_state.sensor_readings]
+        assert sensor_ids[0] == "thickness_001"
+        assert sensor_ids[-1] == "csv_001"
+        assert len(sensor_ids) == 6
+        assert SensorType.TEMPERATURE in result_state.sensor_arrays
+        assert any("missing_sensors.json" in w for w in result_state.warnings)
+        assert any("读取失败" in w and "corrupt.json" in w for w in result_state.warnings)
+        assert any("读取失败" in w and "sensors.xml" in w for w in result_state.warnings)
+    
     def test_sample_image_generation(self):
         """测试示例图像生成"""
         node = DataCollectionNode()
@@ -151,6 +220,49 @@ class TestRiskAssessmentNode:
         assert result_state.risk_assessment is not None
         assert result_state.risk_assessment.corrosion_level == CorrosionLevel.LOW
     
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_async_llm_calls_overlap(self, monkeypatch):
+        """测试维护洞察与报告摘要两次LLM调用并发执行，回退摘要基于合并后的建议"""
+        events = []
+        
+        class SlowLLMService:
+            async def agenerate_maintenance_insights(self, risk_assessment):
+                events.append("insights_start")
+                await asyncio.sleep(0.05)
+                events.append("insights_end")
+                return ["LLM建议"]
+            
+            async def agenerate_enhanced_report_summary(self, *args, fallback=True):
+                events.append("summary_start")
+                await asyncio.sleep(0.05)
+                events.append("summary_end")
+                return None
+            
+            def fallback_summary(self, sensor_data, detections, risk_assessment, platform_id, area):
+                return f"回退摘要: {risk_assessment.recommendations[0]}"
+        
+        monkeypatch.setattr("src.agents.nodes.get_llm_service", SlowLLMService)
+        node = RiskAssessmentNode()
+        state = AgentState(
+            session_id="test_session",
+            current_step="test",
+            platform_id="TEST_PLATFORM",
+            inspection_area="测试区域",
+            corrosion_detections=[CorrosionDetection(
+                detection_id="d1", corrosion_area=300.0, corrosion_depth=1.0,
+                corrosion_type="点蚀", confidence=0.8, timestamp=datetime.now()
+            )],
+            start_time=datetime.now(),
+            last_update=datetime.now()
+        )
+        
+        result_state = await node.aexecute(state)
+        
+        # 两次调用都在任一调用结束前开始
+        assert events[:2] == ["insights_start", "summary_start"]
+        assert result_state.risk_assessment.recommendations[0] == "LLM建议"
+        assert result_state.enhanced_summary == "回退摘要: LLM建议"
+    
     def test_environmental_factor_calculation(self):
         """测试环境因子计算"""
         node = RiskAssessmentNode()
@@ -202,6 +314,173 @@ class TestImageProcessor:
         assert image.dtype.name == 'uint8'
 
 
+class TestSensorReader:
+    """传感器数据读取器测试类"""
+    
+    def test_csv_invalid_value_skips_row(self, tmp_path):
+        """测试CSV中非数值单元格只跳过所在行"""
+        csv_file = tmp_path / "sensors.csv"
+        csv_file.write_text(
+            "sensor_id,sensor_type,value,unit,timestamp,quality\n"
+            "T1,thickness,12.5,mm,2024-01-01T10:00:00,0.9\n"
+            "T2,thickness,abc,mm,2024-01-01T10:00:00,0.9\n"
+            "T3,thickness,11.0,mm,2024-01-01T10:00:00,0.8\n",
+            encoding="utf-8"
+        )
+        
+        readings = SensorReader().read_sensor_file(str(csv_file))
+        
+        assert [r.sensor_id for r in readings] == ["T1", "T3"]
+        assert [r.value for r in readings] == [12.5, 11.0]
+    
+    def test_hdf5_round_trip(self, tmp_path):
+        """测试CSV转换为HDF5后读回的读数与原读数一致"""
+        pytest.importorskip("h5py")
+        csv_file = tmp_path / "sensors.csv"
+        csv_file.write_text(
+            "sensor_id,sensor_type,value,unit,timestamp,x,y,z,quality\n"
+            "T1,thickness,12.5,mm,2024-01-15T10:30:00,1.0,2.0,3.0,0.9\n"
+            "H1,humidity,80.0,%,2024-01-15T10:31:00.250000,0.0,5.0,0.0,0.95\n"
+            "P1,ph,8.1,pH,2024-01-15T10:32:00,4.0,0.0,1.5,0.8\n",
+            encoding="utf-8"
+        )
+        h5_file = tmp_path / "sensors.h5"
+        reader = SensorReader()
+        
+        written = reader.convert_to_hdf5(str(csv_file), str(h5_file))
+        original = reader.read_sensor_file(str(csv_file))
+        restored = reader.read_sensor_file(str(h5_file))
+        
+        assert written == len(original) == len(restored) == 3
+        for before, after in zip(original, restored):
+            assert after.model_dump() == before.model_dump()
+    
+    def test_batch_matches_list_path(self, tmp_path):
+        """测试SoA批次的数值与过滤结果与读数列表一致"""
+        json_file = tmp_path / "sensors.json"
+        json_file.write_text(json.dumps([
+            {"sensor_id": "T1", "sensor_type": "thickness", "value": 12.5, "unit": "mm",
+             "timestamp": "2024-01-15T10:30:00+00:00", "quality": 0.95},
+            {"sensor_id": "T2", "sensor_type": "thickness", "value": 9.2, "unit": "mm",
+             "timestamp": "2024-01-15T18:45:00+08:00", "quality": 0.6},
+            {"sensor_id": "C1", "sensor_type": "temperature", "value": 25.3, "unit": "°C",
+             "timestamp": "2024-01-15T11:00:00Z", "quality": 0.9},
+            {"sensor_id": "P1", "sensor_type": "ph", "value": 8.1, "unit": "pH",
+             "timestamp": "2024-01-15T09:00:00-02:00", "quality": 0.75}
+        ]), encoding="utf-8")
+        reader = SensorReader()
+        
+        readings = reader.read_sensor_file(str(json_file))
+        batch = reader.read_sensor_batch(str(json_file))
+        
+        assert len(batch) == len(readings) == 4
+        assert batch.to_list() == readings
+        assert batch.values.tolist() == [r.value for r in readings]
+        assert batch.qualities.tolist() == [r.quality for r in readings]
+        
+        def ids(items):
+            return [r.sensor_id for r in items]
+        
+        assert ids(reader.filter_by_quality(batch, 0.7).to_list()) == ids(reader.filter_by_quality(readings, 0.7))
+        assert ids(reader.get_readings_by_type(batch, SensorType.THICKNESS).to_list()) == \
+            ids(reader.get_readings_by_type(readings, SensorType.THICKNESS))
+        start = datetime(2024, 1, 15, 10, 40, tzinfo=timezone.utc)
+        end = datetime(2024, 1, 15, 11, 0, tzinfo=timezone.utc)
+        assert ids(reader.filter_by_time_range(batch, start, end).to_list()) == \
+            ids(reader.filter_by_time_range(readings, start, end)) == ["T2", "C1", "P1"]
+    
+    def test_batch_validation_matches_single(self):
+        """测试批量校验掩码与逐条校验结果一致（含范围边界与质量越界）"""
+        cases = [
+            (SensorType.THICKNESS, 0.0, 0.9), (SensorType.THICKNESS, 50.0, 0.9),
+            (SensorType.THICKNESS, -0.1, 0.9), (SensorType.THICKNESS, 50.1, 0.9),
+            (SensorType.TEMPERATURE, -50.0, 1.0), (SensorType.TEMPERATURE, 100.5, 0.5),
+            (SensorType.HUMIDITY, 100.0, 0.0), (SensorType.PH, 14.1, 0.8),
+            (SensorType.CONDUCTIVITY, 1e6, 0.9), (SensorType.PRESSURE, -1e6, 0.9),
+            (SensorType.PH, 7.0, 1.1), (SensorType.HUMIDITY, 50.0, -0.1)
+        ]
+        # 越界的质量评分无法通过模型校验，直接构造
+        readings = [
+            SensorData.model_construct(
+                sensor_id=f"s{i}", sensor_type=sensor_type, value=value, unit="",
+                timestamp=datetime(2024, 1, 15, 10, 30), location={"x": 0, "y": 0, "z": 0},
+                quality=quality
+            )
+            for i, (sensor_type, value, quality) in enumerate(cases)
+        ]
+        reader = SensorReader()
+        
+        mask = reader.validate_sensor_batch(SensorBatch.from_readings(readings))
+        
+        assert mask.tolist() == [reader.validate_sensor_data(r) for r in readings]
+        assert mask.tolist() == [True, True, False, False, True, False, True, False, True, True, False, False]
+    
+    def test_json_fast_path_matches_generic_parse(self, tmp_path):
+        """测试JSON字段齐全记录的快速解析与通用解析结果一致，字段不全时回退到通用解析"""
+        complete = {
+            "sensor_id": "T1", "sensor_type": "THICKNESS", "value": "12.5", "unit": "mm",
+            "timestamp": "2024-01-15T10:30:00+08:00", "location": {"x": 1, "y": 2, "z": 3},
+            "quality": 0.9
+        }
+        items = [
+            complete,
+            {**complete, "sensor_id": "U1", "sensor_type": "unknown_type"},
+            {key: value for key, value in complete.items() if key != "unit"},
+            {key: value for key, value in complete.items() if key != "location"},
+            {**complete, "sensor_id": "L1", "location": "deck"},
+            {**complete, "sensor_id": "Q1", "quality": 1.5}
+        ]
+        json_file = tmp_path / "sensors.json"
+        json_file.write_text(json.dumps(items), encoding="utf-8")
+        reader = SensorReader()
+        now = datetime.now()
+        
+        assert reader._parse_complete_item(complete, now) == reader._parse_sensor_item(complete)
+        with pytest.raises(KeyError):
+            reader._parse_complete_item(items[2], now)
+        
+        # 非法质量评分两条路径都会丢弃该记录
+        expected = [reader._parse_sensor_item(item) for item in items]
+        assert expected[-1] is None
+        assert reader.read_sensor_file(str(json_file)) == expected[:-1]
+    
+    def test_csv_timestamp_parsing(self, tmp_path):
+        """测试CSV时间戳列：无时区、带偏移、混合与非法时间戳"""
+        reader = SensorReader()
+        
+        def read(name, timestamps):
+            csv_file = tmp_path / name
+            rows = "".join(
+                f"S{i},thickness,10.0,mm,{timestamp},0.9\n" for i, timestamp in enumerate(timestamps)
+            )
+            csv_file.write_text("sensor_id,sensor_type,value,unit,timestamp,quality\n" + rows, encoding="utf-8")
+            return reader.read_sensor_file(str(csv_file))
+        
+        # 无时区：整列解析为naive时间
+        naive = read("naive.csv", ["2024-01-15T10:30:00", "2024-01-15 10:31:00.500000"])
+        assert [r.timestamp for r in naive] == [
+            datetime(2024, 1, 15, 10, 30), datetime(2024, 1, 15, 10, 31, 0, 500000)
+        ]
+        
+        # 带偏移：保留时区信息
+        offset = read("offset.csv", ["2024-01-15T10:30:00+08:00", "2024-01-15T02:30:00Z"])
+        assert [r.timestamp for r in offset] == [datetime(2024, 1, 15, 2, 30, tzinfo=timezone.utc)] * 2
+        assert all(r.timestamp.tzinfo is not None for r in offset)
+        
+        # 时区不一致：回退到逐行解析，各行保持原样
+        mixed = read("mixed.csv", ["2024-01-15T10:30:00", "2024-01-15T10:30:00+08:00"])
+        assert mixed[0].timestamp.tzinfo is None
+        assert mixed[1].timestamp.utcoffset().total_seconds() == 8 * 3600
+        
+        # 非法时间戳只跳过所在行，空单元格使用读取时间
+        before = datetime.now()
+        malformed = read("malformed.csv", ["2024-01-15T10:30:00", "not-a-time", ""])
+        after = datetime.now()
+        assert [r.sensor_id for r in malformed] == ["S0", "S2"]
+        assert malformed[0].timestamp == datetime(2024, 1, 15, 10, 30)
+        assert before <= malformed[1].timestamp <= after
+
+
 class TestConfiguration:
     """配置测试类"""
     
@@ -225,30 +504,157 @@ class TestConfiguration:
         
         # 测试严重风险
         assert config.get_risk_level(0.9) == "CRITICAL"
+    
+    def test_risk_level_threshold_edges(self):
+        """测试阈值边界：分数等于阈值时归入更高一级，批量结果与逐个结果一致"""
+        low = config.low_risk_threshold
+        medium = config.medium_risk_threshold
+        high = config.high_risk_threshold
+        scores = [0.0, np.nextafter(low, 0.0), low, np.nextafter(medium, 0.0), medium,
+                  np.nextafter(high, 0.0), high, 1.0]
+        expected = ["LOW", "LOW", "MEDIUM", "MEDIUM", "HIGH", "HIGH", "CRITICAL", "CRITICAL"]
+        
+        assert [config.get_risk_level(score) for score in scores] == expected
+        assert config.get_risk_levels(np.array(scores)).tolist() == expected
+        assert config.get_risk_levels(np.array([], dtype=np.float64)).tolist() == []
 
 
-@pytest.mark.asyncio
+class TestLLMService:
+    """LLM服务解析逻辑测试类"""
+    
+    def test_parse_analysis_result_with_surrounding_text(self):
+        """测试JSON前后带说明文字或代码块标记时只解析花括号之间的内容"""
+        service = QwenLLMService()
+        result = service._parse_analysis_result(
+            '分析结果如下：\n```json\n{"severity_assessment": "中等", "root_causes": ["盐雾"]}\n```\n以上供参考。'
+        )
+        
+        assert result == {"severity_assessment": "中等", "root_causes": ["盐雾"]}
+    
+    def test_parse_analysis_result_with_nested_braces(self):
+        """测试嵌套对象完整保留"""
+        service = QwenLLMService()
+        result = service._parse_analysis_result(
+            '结果：{"severity_assessment": "严重", "details": {"depth": {"max": 1.2}}}。'
+        )
+        
+        assert result["details"] == {"depth": {"max": 1.2}}
+    
+    def test_parse_analysis_result_without_json(self):
+        """测试没有有效JSON时回退为文本洞察，长文本截断"""
+        service = QwenLLMService()
+        
+        plain = service._parse_analysis_result("腐蚀较轻，建议持续监测")
+        assert plain["technical_insights"] == "腐蚀较轻，建议持续监测"
+        assert plain["root_causes"] == ["需要进一步分析"]
+        
+        invalid = service._parse_analysis_result("{不是JSON}")
+        assert invalid["technical_insights"] == "{不是JSON}"
+        
+        long_text = "无" * 250
+        assert service._parse_analysis_result(long_text)["technical_insights"] == "无" * 200 + "..."
+    
+    def test_parse_insight_line_list_prefixes(self):
+        """测试建议列表行的编号、列表符号和中文序号被清理，普通文本保持不变"""
+        service = QwenLLMService()
+        
+        for line in ["1. 更换防腐涂层", "12.更换防腐涂层", "3、更换防腐涂层", "2) 更换防腐涂层",
+                     "（4）更换防腐涂层", "(5) 更换防腐涂层", "三、更换防腐涂层",
+                     "- 更换防腐涂层", "• 更换防腐涂层", "  1.  更换防腐涂层  "]:
+            assert service._parse_insight_line(line) == "更换防腐涂层"
+        
+        # 以数字开头的正文不是编号
+        assert service._parse_insight_line("1.5mm以上的减薄区域需复查") == "1.5mm以上的减薄区域需复查"
+        assert service._parse_insight_line("3天内完成复检") == "3天内完成复检"
+        # 非列表行被忽略，正则不改动普通文本
+        assert service._parse_insight_line("以下是维护建议：") is None
+        assert service._parse_insight_line("   ") is None
+        assert _LIST_PREFIX_RE.sub("", "建议每季度检测一次", count=1) == "建议每季度检测一次"
+
+
+class _FanOutState(BaseModel):
+    """Send分支归并测试用的状态"""
+    items: Annotated[List[int], operator.add] = Field(default_factory=list)
+    label: str = ""
+    errors: List[str] = Field(default_factory=list)
+
+
+class TestMockLangGraph:
+    """简化LangGraph的Send分支归并测试类"""
+    
+    def _build_graph(self):
+        """构建 start -> [branch x3] -> finish 的分支图，值为2的分支抛出异常"""
+        async def branch(value):
+            # 先派发的分支后完成，验证归并顺序与派发顺序一致
+            await asyncio.sleep(0.01 * (4 - value))
+            if value == 2:
+                raise RuntimeError("分支失败")
+            return {"items": [value], "label": f"branch_{value}"}
+        
+        workflow = StateGraph(_FanOutState)
+        workflow.add_node("start", lambda state: state)
+        workflow.add_node("branch", branch)
+        workflow.add_node("finish", lambda state: state)
+        workflow.set_entry_point("start")
+        workflow.add_conditional_edges(
+            "start", lambda state: [Send("branch", value) for value in (1, 2, 3)], {}
+        )
+        workflow.add_edge("branch", "finish")
+        workflow.add_edge("finish", END)
+        return workflow.compile()
+    
+    def test_collect_reducers(self):
+        """测试从Annotated注解提取归并函数"""
+        assert _collect_reducers(_FanOutState) == {"items": operator.add}
+    
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_async_send_results_merged_with_reducer(self):
+        """测试并发分支结果按reducer追加，其余字段直接覆盖，失败分支记录错误"""
+        result = await self._build_graph().ainvoke(_FanOutState(items=[0]))
+        
+        assert result.items == [0, 1, 3]
+        assert result.label == "branch_3"
+        assert len(result.errors) == 1
+        assert "branch" in result.errors[0]
+    
+    def test_sync_send_results_merged_with_reducer(self):
+        """测试同步执行时分支结果同样按reducer归并"""
+        result = self._build_graph().invoke(_FanOutState(items=[0]))
+        
+        assert result.items == [0, 1, 3]
+        assert len(result.errors) == 1
+
+
+@pytest.mark.asyncio(loop_scope="session")
 async def test_full_workflow():
-    """测试完整工作流"""
+    """测试完整工作流（多个平台并发执行）"""
     agent = CorrosionDetectionAgent()
+    targets = [
+        ("FULL_TEST_PLATFORM", "完整测试区域"),
+        ("FULL_TEST_PLATFORM_2", "完整测试区域2")
+    ]
+    
+    results = await asyncio.gather(*(
+        agent.run_inspection(platform_id=platform_id, inspection_area=area)
+        for platform_id, area in targets
+    ))
+    
+    for (platform_id, area), result in zip(targets, results):
+        # 验证完整流程的结果
+        assert result.session_id is not None
+        assert result.current_step == "report_generation"
+        assert result.final_report is not None
+        assert result.risk_assessment is not None
+        
+        # 验证报告内容
+        report = result.final_report
+        assert report.platform_id == platform_id
+        assert report.area_inspected == area
+        assert report.inspector == "Corrosion Detection Agent"
+        assert len(report.maintenance_recommendations) > 0
     
-    result = await agent.run_inspection(
-        platform_id="FULL_TEST_PLATFORM",
-        inspection_area="完整测试区域"
-    )
-    
-    # 验证完整流程的结果
-    assert result.session_id is not None
-    assert result.current_step == "report_generation"
-    assert result.final_report is not None
-    assert result.risk_assessment is not None
-    
-    # 验证报告内容
-    report = result.final_report
-    assert report.platform_id == "FULL_TEST_PLATFORM"
-    assert report.area_inspected == "完整测试区域"
-    assert report.inspector == "Corrosion Detection Agent"
-    assert len(report.maintenance_recommendations) > 0
+    # 并发执行的会话互不干扰
+    assert results[0].session_id != results[1].session_id
 
 
 if __name__ == "__main__":